@@ -0,0 +1,293 @@
+import argparse
+import functools
+import json
+import re
+import sys
+import time
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import indexes
+import jsonisator
+
+# Whitaker-style analysis of inflected Latin forms, built on the converted dictionary and inflections.
+#
+# A form is split into every possible stem + ending pair: the endings come from the ending index (one walk
+# from the last letter of the form) and each remaining stem is looked up among the stems of the dictionary.
+# An inflection then applies to a dictionary entry if the stem was found in the slot the inflection asks for
+# (entry["stems"][inflection["stem"] - 1]) and the two agree in their POS, declension/conjugation and variant.
+
+# One way of reading a form: the entry (its position within DICTLINE.json), the inflection (its position
+# within INFLECTS.json) and the stem and ending the form was split into
+Analysis = namedtuple("Analysis", ("entry", "inflection", "stem", "ending"))
+
+# Number of analysed forms kept in the cache of each analyzer
+CACHE_SIZE = 65536
+
+# Batch analysis of texts: number of worker processes (1 analyses the text in this very process) and number of
+# distinct forms handed to a worker at once
+WORKERS = 1
+BATCH_SIZE = 1000
+
+# Tokens of a text are runs of letters
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+")
+
+# POS of the dictionary entries each kind of inflection applies to
+INFLECTION_POS = {
+    "N": ("N",),
+    "PRON": ("PRON", "PACK"),
+    "ADJ": ("ADJ",),
+    "NUM": ("NUM",),
+    "V": ("V",),
+    "VPAR": ("V",),
+    "SUPINE": ("V",),
+    "ADV": ("ADV",),
+    "PREP": ("PREP",),
+    "CONJ": ("CONJ",),
+    "INTERJ": ("INTERJ",)
+}
+
+
+def entry_class(entry):
+    # The declension (or conjugation) and its variant an entry is inflected by, (0, 0) for uninflected ones
+    if "declension" in entry:
+        return entry["declension"], entry["declension_variant"]
+    if "conjugation" in entry:
+        return entry["conjugation"], entry["conjugation_variant"]
+    return 0, 0
+
+
+def class_applies(inflection_class, inflection_variant, entry_class, entry_variant):
+    # Whitaker's tables use 0 as a wildcard: an inflection of declension/conjugation 0 applies to all of them
+    # (such as the endings of the perfect system), while one of variant 0 applies to all variants of its
+    # declension/conjugation.
+    if inflection_class == 0:
+        return True
+    return inflection_class == entry_class and (inflection_variant == 0 or inflection_variant == entry_variant)
+
+
+def agrees(entry, inflection):
+    # Checks the fields beyond the declension/conjugation which have to agree between an entry and an inflection
+    if entry["pos"] == "N":
+        # Inflections of gender X apply to any noun, those of gender C to masculine and feminine ones
+        gender = inflection["gender"]
+        return gender == "X" or gender == entry["gender"] or (gender == "C" and entry["gender"] in ("M", "F", "C"))
+
+    if entry["pos"] == "ADV":
+        comparison = inflection["comparison"]
+        return comparison == "X" or entry["comparison"] == "X" or comparison == entry["comparison"]
+
+    if entry["pos"] == "PREP":
+        return inflection["case"] == entry["case"]
+
+    return True
+
+
+class Analyzer:
+    # Analyses forms using the given dictionary entries and inflections (as they are saved in the JSON files).
+    #
+    # Analysed forms are kept in a bounded LRU cache, as the same forms keep coming up in real texts. Its hits
+    # and misses are reported by cache_info().
+
+    def __init__(self, entries, inflections, cache_size = CACHE_SIZE):
+        self.entries = entries
+        self.inflections = inflections
+
+        # Stem (in lower case) -> [(entry, stem number)]
+        self.stems = {}
+
+        # POS and declension/conjugation of each entry, so matching doesn't have to look into the entries
+        self.classes = []
+
+        for number, entry in enumerate(entries):
+            for slot, stem in enumerate(entry["stems"], 1):
+                if stem != jsonisator.NO_STEM:
+                    self.stems.setdefault(stem.lower(), []).append((number, slot))
+
+            self.classes.append((entry["pos"],) + entry_class(entry))
+
+        # The groups of the ending index as (stem number, POS of the entries, class, variant, inflections)
+        self.endings = indexes.EndingIndex.from_inflections(inflections)
+        self._compile_groups(self.endings.root)
+
+        self.analyze = functools.lru_cache(maxsize = cache_size)(self._analyze)
+
+    def _compile_groups(self, node):
+        for key, child in node.items():
+            if key is None:
+                node[None] = [
+                    (
+                        group["stem"],
+                        INFLECTION_POS[group["pos"]],
+                        group.get("declension", group.get("conjugation", 0)),
+                        group.get("declension_variant", group.get("conjugation_variant", 0)),
+                        tuple(group["inflections"])
+                    )
+                    for group in child
+                ]
+            else:
+                self._compile_groups(child)
+
+    @classmethod
+    def load(cls, dictline_path = jsonisator.DICTLINE_JSON_PATH, inflects_path = jsonisator.INFLECTS_JSON_PATH, cache_size = CACHE_SIZE):
+        return cls(jsonisator.load_json(dictline_path), jsonisator.load_json(inflects_path), cache_size)
+
+    def cache_info(self):
+        return self.analyze.cache_info()
+
+    def _analyze(self, word):
+        # Returns a tuple of every Analysis of the form (empty if it can't be analysed)
+        word = word.lower()
+        found = []
+
+        for ending, groups in self.endings.endings(word):
+            stem = word[:len(word) - len(ending)]
+            candidates = self.stems.get(stem)
+
+            if not stem or not candidates:
+                continue
+
+            for number, slot in candidates:
+                pos, entry_class, entry_variant = self.classes[number]
+
+                for stem_number, entry_pos, inflection_class, inflection_variant, inflections in groups:
+                    if stem_number != slot or pos not in entry_pos:
+                        continue
+                    if not class_applies(inflection_class, inflection_variant, entry_class, entry_variant):
+                        continue
+
+                    entry = self.entries[number]
+
+                    for inflection in inflections:
+                        if agrees(entry, self.inflections[inflection]):
+                            found.append(Analysis(number, inflection, stem, ending))
+
+        return tuple(found)
+
+
+_default_analyzer = None
+
+
+def analyze(word):
+    # Analyses a form using the converted files in the output directory, which are loaded on first use
+    global _default_analyzer
+
+    if _default_analyzer is None:
+        _default_analyzer = Analyzer.load()
+
+    return _default_analyzer.analyze(word)
+
+
+#################################
+#        Batch analysis         #
+#################################
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text)
+
+
+def analyze_tokens(tokens, workers = WORKERS, dictline_path = jsonisator.DICTLINE_JSON_PATH, inflects_path = jsonisator.INFLECTS_JSON_PATH):
+    # Yields (token, analyses) for every token, in the order of the tokens.
+    #
+    # Each distinct form is analysed only once. The forms are handed out in batches to the worker processes (each of
+    # which loads the dictionary once) in the order they first occur, so the tokens can be yielded as soon as the
+    # batches they need are back, while the rest are still being analysed.
+    forms = list(dict.fromkeys(token.lower() for token in tokens))
+    first = {form: position for position, form in enumerate(forms)}
+    batches = [forms[start:start + BATCH_SIZE] for start in range(0, len(forms), BATCH_SIZE)]
+
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers = workers, initializer = _load_worker, initargs = (dictline_path, inflects_path))
+        results = executor.map(_analyze_batch, batches)
+    else:
+        executor = None
+        analyzer = Analyzer.load(dictline_path, inflects_path)
+        results = ([analyzer.analyze(form) for form in batch] for batch in batches)
+
+    analysed = {}
+    position = 0
+
+    try:
+        for batch, batch_results in zip(batches, results):
+            analysed.update(zip(batch, batch_results))
+
+            while position < len(tokens) and first[tokens[position].lower()] < len(analysed):
+                yield tokens[position], analysed[tokens[position].lower()]
+                position += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _load_worker(dictline_path, inflects_path):
+    # Run once by every worker process
+    global _default_analyzer
+    _default_analyzer = Analyzer.load(dictline_path, inflects_path)
+
+
+def _analyze_batch(forms):
+    # Run by the worker processes
+    return [_default_analyzer.analyze(form) for form in forms]
+
+
+def write_analyses(results, output_file):
+    # Writes (token, analyses) pairs as NDJSON, one token per line. The analyses of a form are serialised only once.
+    serialised = {}
+    count = 0
+
+    for token, analyses in results:
+        fragment = serialised.get(analyses)
+
+        if fragment is None:
+            fragment = serialised[analyses] = json.dumps([found._asdict() for found in analyses])
+
+        output_file.write('{"token": ' + json.dumps(token) + ', "analyses": ' + fragment + '}\n')
+        count += 1
+
+    return count
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description = "Analyses every token of a Latin text, writing the analyses as NDJSON.")
+    parser.add_argument("text", nargs = "?", help = "text file to analyse (standard input if not given)")
+    parser.add_argument("--output", help = "NDJSON file to write (standard output if not given)")
+    parser.add_argument("--workers", type = int, default = WORKERS, help = "number of processes analysing the forms")
+
+    arguments = parser.parse_args()
+
+    if arguments.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    return arguments
+
+
+def main():
+    arguments = parse_arguments()
+
+    start = time.perf_counter()
+
+    if arguments.text is None:
+        tokens = tokenize(sys.stdin.read())
+    else:
+        with open(arguments.text, encoding = "utf-8") as text_file:
+            tokens = tokenize(text_file.read())
+
+    results = analyze_tokens(tokens, arguments.workers)
+
+    if arguments.output is None:
+        count = write_analyses(results, sys.stdout)
+    else:
+        with open(arguments.output, "w") as output_file:
+            count = write_analyses(results, output_file)
+
+    elapsed = time.perf_counter() - start
+    forms = len(set(token.lower() for token in tokens))
+
+    # Reported on standard error, so it doesn't get mixed up with the analyses
+    print("Analysed " + str(count) + " tokens (" + str(forms) + " distinct forms) in " + str(round(elapsed, 2)) + " s, "
+          + str(round(count / elapsed)) + " tokens/s.", file = sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import random
+import statistics
+import sys
+import time
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import analysis
+import jsonisator
+
+# Measures the latency of analysing a form, both uncached and cached. The forms are made up by joining random
+# stems of the dictionary with random endings of the inflections, so only some of them can actually be analysed.
+# Usage:
+#
+#   python benchmarks/bench_analysis.py [DICTLINE.json] [INFLECTS.json] [forms]
+
+FORMS = 20000
+SEED = 0
+
+
+def make_forms(analyzer, count):
+    generator = random.Random(SEED)
+    stems = list(analyzer.stems)
+    endings = sorted({inflection["ending"] for inflection in analyzer.inflections if inflection["ending"] != jsonisator.NO_ENDING})
+
+    return [generator.choice(stems) + generator.choice(endings + [""]) for _ in range(count)]
+
+
+def latencies(analyze, forms):
+    found = []
+
+    for form in forms:
+        start = time.perf_counter()
+        analyze(form)
+        found.append(time.perf_counter() - start)
+
+    return found
+
+
+def describe(times):
+    times = sorted(times)
+    median = statistics.median(times) * 1000000
+    p99 = times[int(len(times) * 0.99)] * 1000000
+
+    return "median " + str(round(median, 1)) + " us, p99 " + str(round(p99, 1)) + " us"
+
+
+def main():
+    dictline_path = Path(sys.argv[1]) if len(sys.argv) > 1 else jsonisator.DICTLINE_JSON_PATH
+    inflects_path = Path(sys.argv[2]) if len(sys.argv) > 2 else jsonisator.INFLECTS_JSON_PATH
+    count = int(sys.argv[3]) if len(sys.argv) > 3 else FORMS
+
+    start = time.perf_counter()
+    analyzer = analysis.Analyzer.load(dictline_path, inflects_path)
+    print("load:      " + str(round((time.perf_counter() - start) * 1000, 1)) + " ms")
+
+    forms = make_forms(analyzer, count)
+
+    print("uncached:  " + describe(latencies(analyzer._analyze, forms)))
+
+    for form in forms:
+        analyzer.analyze(form)
+    print("cached:    " + describe(latencies(analyzer.analyze, forms)))
+
+    analysed = sum(1 for form in forms if analyzer.analyze(form))
+    print("analysed:  " + str(analysed) + " of " + str(count) + " forms")
+    print("cache:     " + str(analyzer.cache_info()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import jsonisator
+import synthetic
+
+# Benchmarks the converter on synthetic DICTLINE and INFLECTS files (see synthetic.py) of 1x, 10x, 100x etc. the
+# size of the real ones. Usage:
+#
+#   python benchmarks/bench_convert.py [--scales 1 10 100] [--repeats N] [--save-baseline]
+#
+# Each source goes through the phases of the conversion one after the other, each of which is timed on its own:
+#
+# - read: reading the lines of the file
+# - normalize: splitting the lines into their parts (the columns and tokens of DICTLINE, the tokens of INFLECTS),
+#   which is what used to be done by passes of re.sub over every line
+# - parse: turning the lines into entries, which includes the above
+# - serialize: turning the entries into JSON
+# - write: writing the JSON file
+#
+# Every scale is run in a process of its own, so its peak RSS is its own. The results are compared with those
+# saved in BASELINE_PATH (by --save-baseline): a phase going through lines more than TOLERANCE slower, or a peak
+# RSS more than TOLERANCE higher, fails the run. Baselines only compare with runs on the same machine.
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+SCALES = (1, 10)
+REPEATS = 3
+TOLERANCE = 0.25
+
+# Phases shorter than this in the baseline are too noisy to be compared
+MIN_COMPARED_SECONDS = 0.01
+
+PHASES = ("read", "normalize", "parse", "serialize", "write")
+
+
+def _split_dictline(line):
+    return jsonisator._split_columns(line) or jsonisator._split_tokens(line)
+
+
+def _dictline_line(line):
+    return bool(line.strip())
+
+
+def _inflects_line(line):
+    stripped = line.strip()
+    return bool(stripped) and not stripped.startswith("--")
+
+
+SOURCES = {
+    "dictline": (_dictline_line, _split_dictline, jsonisator._parse_dictline_lines),
+    "inflects": (_inflects_line, str.split, jsonisator._parse_inflects_lines)
+}
+
+
+def run_phases(name, source_path, json_path, repeats):
+    # Returns the number of lines of the source and the best time of each phase
+    is_line, split, parse_lines = SOURCES[name]
+    encode = jsonisator.json_encoder()
+    best = {}
+    count = 0
+
+    for _ in range(repeats):
+        times = {}
+
+        start = time.perf_counter()
+        with open(source_path, encoding = jsonisator.SOURCE_ENCODING) as source_file:
+            lines = source_file.readlines()
+        times["read"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for line in lines:
+            if is_line(line):
+                split(line)
+        times["normalize"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        entries = list(parse_lines(lines, jsonisator.ParseReport()))
+        times["parse"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        texts = [encode(entry) for entry in entries]
+        times["serialize"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        jsonisator.write_json_texts(texts, json_path)
+        times["write"] = time.perf_counter() - start
+
+        for phase, seconds in times.items():
+            best[phase] = min(best.get(phase, seconds), seconds)
+
+        count = len(lines)
+        del lines, entries, texts
+
+    return count, best
+
+
+def peak_rss():
+    # In bytes. Linux reports ru_maxrss in kilobytes, macOS in bytes.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_scale(directory, repeats):
+    # Run in the process of its own of each scale
+    directory = Path(directory)
+    results = {}
+
+    for name, source_path in (("dictline", directory / "DICTLINE.TXT"), ("inflects", directory / "INFLECTS.txt")):
+        lines, phases = run_phases(name, source_path, directory / (name.upper() + ".json"), repeats)
+        results[name] = {
+            "lines": lines,
+            "phases": phases,
+            "lines_per_second": lines / sum(phases[phase] for phase in PHASES if phase != "normalize")
+        }
+
+    results["peak_rss"] = peak_rss()
+
+    return results
+
+
+def benchmark(scales, repeats):
+    results = {}
+
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as directory:
+            synthetic.write_sources(directory, scale)
+            output = subprocess.run([sys.executable, __file__, "--run-scale", directory, "--repeats", str(repeats)], stdout = subprocess.PIPE, check = True).stdout
+
+        results[str(scale)] = json.loads(output)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # Returns a description of every regression from the baseline
+    regressions = []
+
+    for scale, result in results.items():
+        base = baseline.get(scale)
+
+        if base is None:
+            continue
+
+        for name in SOURCES:
+            for phase in PHASES:
+                seconds = base[name]["phases"][phase]
+
+                if seconds < MIN_COMPARED_SECONDS:
+                    continue
+
+                speed = result[name]["lines"] / result[name]["phases"][phase]
+                base_speed = base[name]["lines"] / seconds
+
+                if speed * (1 + tolerance) < base_speed:
+                    regressions.append(scale + "x " + name + " " + phase + ": " + str(round(speed)) + " lines/s, baseline " + str(round(base_speed)) + " lines/s")
+
+        if result["peak_rss"] > base["peak_rss"] * (1 + tolerance):
+            regressions.append(scale + "x peak RSS: " + str(round(result["peak_rss"] / 1000000, 1)) + " MB, baseline " + str(round(base["peak_rss"] / 1000000, 1)) + " MB")
+
+    return regressions
+
+
+def format_results(results):
+    text = ""
+
+    for scale, result in results.items():
+        text += scale + "x (peak RSS " + str(round(result["peak_rss"] / 1000000, 1)) + " MB)\n"
+
+        for name in SOURCES:
+            source = result[name]
+            text += "  " + name.ljust(9) + str(source["lines"]).rjust(9) + " lines  " + str(round(source["lines_per_second"])).rjust(8) + " lines/s  "
+            text += "  ".join(phase + " " + str(round(source["phases"][phase] * 1000, 1)) + " ms" for phase in PHASES) + "\n"
+
+    return text
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description = "Benchmarks the converter on synthetic sources.")
+    parser.add_argument("--scales", type = int, nargs = "+", default = SCALES, help = "sizes of the sources, as multiples of the real ones")
+    parser.add_argument("--repeats", type = int, default = REPEATS, help = "number of runs of each phase, of which the best is kept")
+    parser.add_argument("--baseline", type = Path, default = BASELINE_PATH, help = "results to compare with")
+    parser.add_argument("--save-baseline", action = "store_true", help = "save the results as the baseline instead of comparing with it")
+    parser.add_argument("--tolerance", type = float, default = TOLERANCE, help = "slowdown (or growth of the peak RSS) which fails the run")
+    parser.add_argument("--run-scale", help = argparse.SUPPRESS)
+
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+
+    if arguments.run_scale is not None:
+        print(json.dumps(run_scale(arguments.run_scale, arguments.repeats)))
+        return
+
+    results = benchmark(arguments.scales, arguments.repeats)
+    print(format_results(results), end = "")
+
+    if arguments.save_baseline:
+        baseline = {}
+
+        if arguments.baseline.exists():
+            with open(arguments.baseline) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        baseline.update(results)
+
+        with open(arguments.baseline, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent = 4)
+
+        print("Saved the baseline to " + str(arguments.baseline) + ".")
+        return
+
+    if not arguments.baseline.exists():
+        print("No baseline to compare with (save one with --save-baseline).")
+        return
+
+    with open(arguments.baseline) as baseline_file:
+        regressions = compare(results, json.load(baseline_file), arguments.tolerance)
+
+    if regressions:
+        print("Regressions from the baseline:")
+        for regression in regressions:
+            print("  " + regression)
+        sys.exit(1)
+
+    print("No regressions from the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+import re
+import sys
+import time
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import jsonisator
+
+from jsonisator import NO_STEM
+
+# Compares parse_dictline with the way lines were parsed before DICTLINE_SCHEMA and the column
+# tokenizer: two regex passes over the line, splitting it and running it through an if-chain.
+# Usage:
+#
+#   python benchmarks/bench_dispatch.py [path to DICTLINE.TXT] [repeats]
+
+REPEATS = 7
+
+
+def legacy_parse(line):
+    # The parsing as it was before, kept here as the reference
+    line = re.sub(r"\s\s+", " ", line)
+    line = re.sub("zzz", NO_STEM, line)
+
+    try:
+        return legacy_entry(line.split())
+    except (IndexError, ValueError):
+        return None
+
+
+def legacy_entry(sline):
+    if sline[1] == 'N':
+        json_noun_one = {
+            "stems": (sline[0], NO_STEM),
+            "pos": sline[1],
+            "declension": int(sline[2]),
+            "declension_variant": int(sline[3]),
+            "gender": sline[4],
+            "noun_kind": sline[5],
+            "age": sline[6],
+            "area": sline[7],
+            "geography": sline[8],
+            "frequency": sline[9],
+            "source": sline[10],
+            "senses": " ".join(sline[11:])
+        }
+        return json_noun_one
+
+    if sline[2] == 'N':
+        json_noun_two = {
+            "stems": (sline[0], sline[1]),
+            "pos": sline[2],
+            "declension": int(sline[3]),
+            "declension_variant": int(sline[4]),
+            "gender": sline[5],
+            "noun_kind": sline[6],
+            "age": sline[7],
+            "area": sline[8],
+            "geography": sline[9],
+            "frequency": sline[10],
+            "source": sline[11],
+            "senses": " ".join(sline[12:])
+        }
+        return json_noun_two
+
+    if sline[2] == 'PRON':
+        json_pronoun = {
+            "stems": (sline[0], sline[1]),
+            "pos": sline[2],
+            "declension": int(sline[3]),
+            "declension_variant": int(sline[4]),
+            "pronoun_kind": sline[5],
+            "age": sline[6],
+            "area": sline[7],
+            "geography": sline[8],
+            "frequency": sline[9],
+            "source": sline[10],
+            "senses": " ".join(sline[11:])
+        }
+        return json_pronoun
+
+    if sline[1] == 'V':
+        json_verb_one = {
+            "stems": (sline[0], NO_STEM, NO_STEM, NO_STEM),
+            "pos": sline[1],
+            "conjugation": int(sline[2]),
+            "conjugation_variant": int(sline[3]),
+            "verb_kind": sline[4],
+            "age": sline[5],
+            "area": sline[6],
+            "geography": sline[7],
+            "frequency": sline[8],
+            "source": sline[9],
+            "senses": " ".join(sline[10:])
+        }
+        return json_verb_one
+
+    if sline[4] == 'V':
+        json_verb_four = {
+            "stems": (sline[0], sline[1], sline[2], sline[3]),
+            "pos": sline[4],
+            "conjugation": int(sline[5]),
+            "conjugation_variant": int(sline[6]),
+            "verb_kind": sline[7],
+            "age": sline[8],
+            "area": sline[9],
+            "geography": sline[10],
+            "frequency": sline[11],
+            "source": sline[12],
+            "senses": " ".join(sline[13:])
+        }
+        return json_verb_four
+
+    if sline[1] == 'ADJ':
+        json_adjective_one = {
+            "stems": (sline[0], NO_STEM, NO_STEM, NO_STEM),
+            "pos": sline[1],
+            "declension": int(sline[2]),
+            "declension_variant": int(sline[3]),
+            "comparison": sline[4],
+            "age": sline[5],
+            "area": sline[6],
+            "geography": sline[7],
+            "frequency": sline[8],
+            "source": sline[9],
+            "senses": " ".join(sline[10:])
+        }
+        return json_adjective_one
+
+    if sline[2] == 'ADJ':
+        json_adjective_two = {
+            "stems": (sline[0], sline[1], NO_STEM, NO_STEM),
+            "pos": sline[2],
+            "declension": int(sline[3]),
+            "declension_variant": int(sline[4]),
+            "comparison": sline[5],
+            "age": sline[6],
+            "area": sline[7],
+            "geography": sline[8],
+            "frequency": sline[9],
+            "source": sline[10],
+            "senses": " ".join(sline[11:])
+        }
+        return json_adjective_two
+
+    if sline[4] == 'ADJ':
+        json_adjective_four = {
+            "stems": (sline[0], sline[1], sline[2], sline[3]),
+            "pos": sline[4],
+            "declension": int(sline[5]),
+            "declension_variant": int(sline[6]),
+            "comparison": sline[7],
+            "age": sline[8],
+            "area": sline[9],
+            "geography": sline[10],
+            "frequency": sline[11],
+            "source": sline[12],
+            "senses": " ".join(sline[13:])
+        }
+        return json_adjective_four
+
+    if sline[1] == 'ADV':
+        json_adverb_one = {
+            "stems": (sline[0], NO_STEM, NO_STEM),
+            "pos": sline[1],
+            "comparison": sline[2],
+            "age": sline[3],
+            "area": sline[4],
+            "geography": sline[5],
+            "frequency": sline[6],
+            "source": sline[7],
+            "senses": " ".join(sline[8:])
+        }
+        return json_adverb_one
+
+    if sline[3] == 'ADV':
+        json_adverb_three = {
+            "stems": (sline[0], sline[1], sline[2]),
+            "pos": sline[3],
+            "comparison": sline[4],
+            "age": sline[5],
+            "area": sline[6],
+            "geography": sline[7],
+            "frequency": sline[8],
+            "source": sline[9],
+            "senses": " ".join(sline[10:])
+        }
+        return json_adverb_three
+
+    if sline[1] == 'PREP':
+        json_preposition = {
+            # added extra comma to declare a singletone tuple, lest it be parsed as a string
+            "stems": (sline[0],),
+            "pos": sline[1],
+            "case": sline[2],
+            "age": sline[3],
+            "area": sline[4],
+            "geography": sline[5],
+            "frequency": sline[6],
+            "source": sline[7],
+            "senses": " ".join(sline[8:])
+        }
+        return json_preposition
+
+    if sline[1] == 'INTERJ':
+        json_interjection = {
+            "stems": (sline[0],),
+            "pos": sline[1],
+            "age": sline[2],
+            "area": sline[3],
+            "geography": sline[4],
+            "frequency": sline[5],
+            "source": sline[6],
+            "senses": " ".join(sline[7:])
+        }
+        return json_interjection
+
+    if sline[4] == 'NUM':
+        json_number_four = {
+            "stems": (sline[0], sline[1], sline[2], sline[3]),
+            "pos": sline[4],
+            "declension": int(sline[5]),
+            "declension_variant": int(sline[6]),
+            "numeral_sort": sline[7],
+            "numeral_value": int(sline[8]),
+            "age": sline[9],
+            "area": sline[10],
+            "geography": sline[11],
+            "frequency": sline[12],
+            "source": sline[13],
+            "senses": " ".join(sline[14:])
+        }
+        return json_number_four
+
+    if sline[1] == 'NUM':
+        json_number_one = {
+            "stems": (sline[0], NO_STEM, NO_STEM, NO_STEM),
+            "pos": sline[1],
+            "declension": int(sline[2]),
+            "declension_variant": int(sline[3]),
+            "numeral_sort": sline[4],
+            "numeral_value": int(sline[5]),
+            "age": sline[6],
+            "area": sline[7],
+            "geography": sline[8],
+            "frequency": sline[9],
+            "source": sline[10],
+            "senses": " ".join(sline[11:])
+        }
+        return json_number_one
+
+    if sline[1] == 'CONJ':
+        json_conjunction = {
+            "stems": (sline[0],),
+            "pos": sline[1],
+            "age": sline[2],
+            "area": sline[3],
+            "geography": sline[4],
+            "frequency": sline[5],
+            "source": sline[6],
+            "senses": " ".join(sline[7:])
+        }
+        return json_conjunction
+
+    if sline[2] == 'PACK':
+        json_packon = {
+            "stems": (sline[0], sline[1]),
+            "pos": sline[2],
+            "declension": int(sline[3]),
+            "declension_variant": int(sline[4]),
+            "packon_kind": sline[5],
+            "age": sline[6],
+            "area": sline[7],
+            "geography": sline[8],
+            "frequency": sline[9],
+            "source": sline[10],
+            "senses": " ".join(sline[11:])
+        }
+        return json_packon
+
+    return None
+
+
+def lines_per_second(parse, lines, repeats):
+    best = None
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for line in lines:
+            parse(line)
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return len(lines) / best
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else jsonisator.DICTLINE_PATH
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else REPEATS
+
+    with open(path, "r") as dictline_file:
+        lines = [line for line in dictline_file if line.strip()]
+
+    # Both sides have to give the same entries. The old parsing also replaced "zzz" in the senses,
+    # which is why that is done to the new entries before comparing them.
+    for line in lines:
+        entry = jsonisator.parse_dictline(line)
+
+        if entry is not None:
+            entry["senses"] = entry["senses"].replace("zzz", NO_STEM)
+
+        if entry != legacy_parse(line):
+            print("Entries differ for line: " + line)
+            sys.exit(1)
+
+    legacy = lines_per_second(legacy_parse, lines, repeats)
+    current = lines_per_second(jsonisator.parse_dictline, lines, repeats)
+
+    print(str(len(lines)) + " lines, best of " + str(repeats))
+    print("regex and if-chain:    " + str(round(legacy)) + " lines/sec")
+    print("columns and schema:    " + str(round(current)) + " lines/sec")
+    print("gain:                  " + str(round(current / legacy, 2)) + "x")
+
+
+if __name__ == "__main__":
+    main()
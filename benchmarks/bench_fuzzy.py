@@ -0,0 +1,81 @@
+import random
+import statistics
+import sys
+import time
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import indexes
+
+# Compares the fuzzy stem lookup (symmetric deletes) with checking the edit distance of every stem. The words are
+# stems of the index with one or two random letters changed. Usage:
+#
+#   python benchmarks/bench_fuzzy.py [DICTLINE.normalized.idx] [words]
+
+WORDS = 200
+SEED = 0
+LETTERS = "abcdefghilmnopqrstux"
+
+
+def misspell(generator, stem, changes):
+    for _ in range(changes):
+        position = generator.randrange(len(stem) + 1)
+        kind = generator.randrange(3)
+
+        if kind == 0:
+            stem = stem[:position] + generator.choice(LETTERS) + stem[position:]
+        elif kind == 1 and position < len(stem):
+            stem = stem[:position] + stem[position + 1:]
+        else:
+            stem = stem[:position] + generator.choice(LETTERS) + stem[position + 1:]
+
+    return stem
+
+
+def brute_force(stems, word, distance):
+    found = [(stem, indexes.edit_distance(word, stem, distance)) for stem in stems]
+    return sorted(((stem, stem_distance) for stem, stem_distance in found if stem_distance <= distance), key = lambda item: (item[1], item[0]))
+
+
+def median_time(lookup, words):
+    times = []
+
+    for word in words:
+        start = time.perf_counter()
+        lookup(word)
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else indexes.NORMALIZED_INDEX_PATH
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else WORDS
+
+    # Only the stems of the index are used, so it isn't checked against DICTLINE.json
+    index = indexes.NormalizedStemIndex(path, json_path = None)
+    stems = index.stems()
+
+    start = time.perf_counter()
+    fuzzy = indexes.FuzzyStems(stems)
+    print("build:      " + str(round(time.perf_counter() - start, 2)) + " s for " + str(len(stems)) + " stems")
+
+    generator = random.Random(SEED)
+
+    for distance in (1, 2):
+        words = [misspell(generator, generator.choice(stems), distance) for _ in range(count)]
+
+        for word in words:
+            if fuzzy.lookup(word, distance) != brute_force(stems, word, distance):
+                raise AssertionError("Fuzzy lookup differs from brute force for " + word)
+
+        fuzzy_time = median_time(lambda word: fuzzy.lookup(word, distance), words)
+        brute_time = median_time(lambda word: brute_force(stems, word, distance), words)
+
+        print("distance " + str(distance) + ": " + str(round(fuzzy_time * 1000000, 1)) + " us (brute force " + str(round(brute_time * 1000, 1)) + " ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import json
+import sys
+import tracemalloc
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import jsonisator
+import record_store
+
+# Compares the memory taken by the entries of DICTLINE.json as a list of dicts with that of the record store,
+# as measured by tracemalloc. Usage:
+#
+#   python benchmarks/bench_record_store.py [DICTLINE.json]
+
+
+def measure(load):
+    # Returns what load() gives along with the memory still held by it once it is done
+    tracemalloc.start()
+    loaded = load()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return loaded, size
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else jsonisator.DICTLINE_JSON_PATH
+
+    entries, dicts_size = measure(lambda: jsonisator.load_json(path))
+    count = len(entries)
+
+    store, store_size = measure(lambda: record_store.RecordStore(entries))
+
+    # Stems come back as tuples, the same as from the parser, rather than as lists
+    if json.dumps(store.to_dicts()) != json.dumps(entries):
+        raise SystemExit("The store does not give back the entries.")
+
+    print("entries:        " + str(count))
+    print("list of dicts:  " + str(round(dicts_size / count)) + " bytes per entry")
+    print("record store:   " + str(round(store_size / count)) + " bytes per entry (" + str(round(dicts_size / store_size, 1)) + "x smaller)")
+
+
+if __name__ == "__main__":
+    main()
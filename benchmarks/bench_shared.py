@@ -0,0 +1,85 @@
+import multiprocessing
+import sys
+import time
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import jsonisator
+import shared_dictionary
+
+# Compares workers which each load DICTLINE.json with workers which attach to the dictionary in shared memory: the
+# time each takes to be ready and the memory each adds, as its proportional set size (PSS, which splits the shared
+# pages between the processes sharing them). Linux only, as PSS is read from /proc. Usage:
+#
+#   python benchmarks/bench_shared.py [DICTLINE.json] [workers]
+
+WORKERS = 4
+
+NAME = "whitaker-words-bench"
+
+
+def pss():
+    # In bytes
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) * 1024
+
+
+def worker(mode, path, results):
+    before = pss()
+    start = time.perf_counter()
+
+    if mode == "json":
+        entries = jsonisator.load_json(path)
+    else:
+        entries = shared_dictionary.SharedDictionary.attach(NAME)
+
+    ready = time.perf_counter() - start
+
+    # Every entry is read once, as a server would over time
+    for entry in entries:
+        pass
+
+    results.put((ready, pss() - before))
+
+
+def run(mode, path, workers):
+    # Returns the average time to be ready and the memory added by each worker, measured while all of them are running
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [context.Process(target = worker, args = (mode, path, results)) for _ in range(workers)]
+
+    for process in processes:
+        process.start()
+
+    measured = [results.get() for _ in processes]
+
+    for process in processes:
+        process.join()
+
+    return sum(ready for ready, _ in measured) / workers, sum(memory for _, memory in measured) / workers
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else jsonisator.DICTLINE_JSON_PATH
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else WORKERS
+
+    memory = shared_dictionary.create(path, NAME)
+
+    try:
+        for mode in ("json", "shared"):
+            ready, added = run(mode, path, workers)
+            print(mode.ljust(7) + str(workers) + " workers: ready in " + str(round(ready * 1000, 1)) + " ms, "
+                  + str(round(added / 1000000, 1)) + " MB each (" + str(round(added * workers / 1000000, 1)) + " MB in all)")
+
+        print("shared segment: " + str(round(memory.size / 1000000, 1)) + " MB")
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+if __name__ == "__main__":
+    main()
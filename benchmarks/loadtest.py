@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import jsonisator
+import server
+
+# Load test of the lookup server (see server.py), which has to be running already. Several connections send
+# requests one after another (keeping the connection open), picked at random among lookups by entry id, by stem
+# and by analysed form. The stems and forms are taken from the dictionary itself. Usage:
+#
+#   python benchmarks/loadtest.py [--requests N] [--connections N] [--host HOST] [--port PORT] [--dictline PATH]
+
+REQUESTS = 20000
+CONNECTIONS = 16
+SEED = 0
+
+# Endings put after the stems to make up forms to analyse
+ENDINGS = ("", "a", "ae", "am", "is", "um", "us", "o", "orum", "at", "it", "ant", "are", "avit")
+
+
+def make_paths(entries, count):
+    generator = random.Random(SEED)
+    stems = sorted({stem for entry in entries for stem in entry["stems"] if stem != jsonisator.NO_STEM})
+    paths = []
+
+    for _ in range(count):
+        kind = generator.randrange(3)
+
+        if kind == 0:
+            paths.append("/entry/" + str(generator.randrange(len(entries))))
+        elif kind == 1:
+            paths.append("/stem/" + generator.choice(stems))
+        else:
+            paths.append("/analyze/" + generator.choice(stems) + generator.choice(ENDINGS))
+
+    return paths
+
+
+async def run_connection(host, port, paths, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+
+    for path in paths:
+        start = time.perf_counter()
+
+        writer.write(("GET " + path + " HTTP/1.1\r\nHost: " + host + "\r\n\r\n").encode("utf-8"))
+
+        length = 0
+        while True:
+            header = await reader.readline()
+
+            if header in (b"\r\n", b""):
+                break
+            if header.lower().startswith(b"content-length:"):
+                length = int(header.split(b":", 1)[1])
+
+        await reader.readexactly(length)
+
+        latencies.append(time.perf_counter() - start)
+
+    writer.close()
+
+
+async def run(host, port, paths, connections):
+    latencies = []
+    await asyncio.gather(*(run_connection(host, port, paths[index::connections], latencies) for index in range(connections)))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Load tests the lookup server.")
+    parser.add_argument("--host", default = server.HOST)
+    parser.add_argument("--port", type = int, default = server.PORT)
+    parser.add_argument("--requests", type = int, default = REQUESTS)
+    parser.add_argument("--connections", type = int, default = CONNECTIONS)
+    parser.add_argument("--dictline", default = jsonisator.DICTLINE_JSON_PATH)
+    arguments = parser.parse_args()
+
+    paths = make_paths(jsonisator.load_json(arguments.dictline), arguments.requests)
+
+    start = time.perf_counter()
+    latencies = sorted(asyncio.run(run(arguments.host, arguments.port, paths, arguments.connections)))
+    elapsed = time.perf_counter() - start
+
+    print("requests:  " + str(len(latencies)) + " over " + str(arguments.connections) + " connections in " + str(round(elapsed, 2)) + " s")
+    print("rate:      " + str(round(len(latencies) / elapsed)) + " requests/s")
+    print("latency:   p50 " + str(round(statistics.median(latencies) * 1000, 2)) + " ms, p99 " + str(round(latencies[int(len(latencies) * 0.99)] * 1000, 2)) + " ms")
+
+
+if __name__ == "__main__":
+    main()
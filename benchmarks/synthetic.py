@@ -0,0 +1,160 @@
+import random
+import sys
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import jsonisator
+
+# Writes synthetic DICTLINE and INFLECTS files of any size, for benchmarking the converter. Usage:
+#
+#   python benchmarks/synthetic.py SCALE [DIRECTORY]
+#
+# writes DICTLINE.TXT and INFLECTS.txt SCALE times the size of the real ones. The lines follow the layouts of
+# jsonisator.DICTLINE_SCHEMA and INFLECTS_SCHEMA (stems in their columns, the fields of each POS and the common
+# fields), with the parts of speech in about the same proportions as in the real files. The same scale and seed
+# always give the same files.
+
+# Number of lines of the real files
+DICTLINE_LINES = 39225
+INFLECTS_LINES = 3181
+
+# Entries/inflections of each POS in the real files
+DICTLINE_POS_COUNTS = {
+    "N": 15850, "PRON": 70, "V": 7250, "ADJ": 8300, "ADV": 3550,
+    "PREP": 60, "INTERJ": 70, "NUM": 120, "CONJ": 80, "PACK": 25
+}
+INFLECTS_POS_COUNTS = {
+    "N": 250, "PRON": 169, "V": 654, "ADJ": 226, "ADV": 6, "PREP": 3,
+    "INTERJ": 1, "NUM": 127, "CONJ": 1, "VPAR": 346, "SUPINE": 2
+}
+
+# Share of the INFLECTS lines which are comments and blank lines
+INFLECTS_COMMENTS = 0.03
+INFLECTS_BLANKS = 0.26
+
+SEED = 1
+
+# Values each field is picked from
+FIELD_VALUES = {
+    "declension": range(1, 10),
+    "declension_variant": range(0, 10),
+    "conjugation": range(1, 10),
+    "conjugation_variant": range(0, 10),
+    "gender": ("M", "F", "N", "C", "X"),
+    "noun_kind": ("T", "P", "L", "W", "A", "X"),
+    "pronoun_kind": ("PERS", "DEMONS", "REL", "INDEF", "ADJECT", "X"),
+    "packon_kind": ("REL", "INTERR", "INDEF", "ADJECT"),
+    "verb_kind": ("TRANS", "INTRANS", "DEP", "SEMIDEP", "IMPERS", "X"),
+    "comparison": ("POS", "COMP", "SUPER", "X"),
+    "case": ("NOM", "GEN", "DAT", "ACC", "ABL", "VOC", "LOC", "X"),
+    "numeral_sort": ("CARD", "ORD", "DIST", "ADVERB", "X"),
+    "numeral_value": range(0, 1001),
+    "number": ("S", "P", "X"),
+    "tense": ("PRES", "IMPF", "FUT", "PERF", "PLUP", "FUTP", "X"),
+    "voice": ("ACTIVE", "PASSIVE", "X"),
+    "mood": ("IND", "SUB", "IMP", "INF", "PPL", "X"),
+    "person": range(0, 4),
+    "age": ("X", "A", "B", "C", "D", "E", "F", "G", "H"),
+    "area": ("X", "A", "B", "D", "E", "G", "L", "P", "S", "T", "W"),
+    "geography": ("X", "A", "B", "C", "E", "F", "G", "H", "I", "Q", "S"),
+    "frequency": ("X", "A", "B", "C", "D", "E", "F", "I", "M", "N"),
+    "source": ("X", "B", "C", "D", "E", "G", "O", "S", "W")
+}
+
+LETTERS = "abcdefghilmnopqrstuvx"
+SENSE_WORDS = (
+    "good", "old", "table", "small", "think", "believe", "there", "well", "three", "thousand", "where", "who",
+    "to", "of", "be", "make", "large", "house", "war", "field", "water", "time", "way", "sea", "king", "city"
+)
+
+
+def _stem(rng):
+    return "".join(rng.choice(LETTERS) for _ in range(rng.randint(2, 10)))
+
+
+def _senses(rng):
+    meanings = [" ".join(rng.choice(SENSE_WORDS) for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(1, 5))]
+    return ", ".join(meanings) + ";"
+
+
+def _value(rng, name):
+    return str(rng.choice(FIELD_VALUES[name]))
+
+
+def _pos_sequence(rng, counts, total):
+    # The POS of each line, in the proportions of the real files
+    return rng.choices(list(counts), weights = list(counts.values()), k = total)
+
+
+def dictline_line(rng, pos):
+    stem_count, given_counts, fields = jsonisator.DICTLINE_SCHEMA[pos]
+
+    # Most lines give all the stems of their POS. Stems an entry doesn't have are left blank or given as zzz.
+    given = stem_count if rng.random() < 0.9 else rng.choice(given_counts)
+    stems = [_stem(rng) for _ in range(given)]
+
+    if given > 1 and rng.random() < 0.1:
+        stems[rng.randrange(1, given)] = "zzz"
+
+    line = "".join(stem.ljust(jsonisator.STEM_WIDTH) for stem in stems)
+    line += pos.ljust(7)
+    line += " ".join(_value(rng, name) for name, _ in fields).ljust(17)
+    line += " ".join(_value(rng, name) for name in jsonisator.DICTLINE_COMMON_FIELDS)
+
+    return line + " " + _senses(rng) + "\n"
+
+
+def inflects_line(rng, pos):
+    values = [_value(rng, name) for name, _ in jsonisator.INFLECTS_SCHEMA[pos]]
+
+    ending = "".join(rng.choice(LETTERS) for _ in range(rng.randint(0, 5)))
+    values += [str(rng.randint(1, 4)), str(len(ending)), ending or "NULL", _value(rng, "age"), _value(rng, "frequency")]
+
+    return pos.ljust(6) + " " + " ".join(value.ljust(2) for value in values) + "\n"
+
+
+def write_dictline(path, lines, seed = SEED):
+    rng = random.Random(seed)
+
+    with open(path, "w", encoding = jsonisator.SOURCE_ENCODING, newline = "\n") as dictline_file:
+        for pos in _pos_sequence(rng, DICTLINE_POS_COUNTS, lines):
+            dictline_file.write(dictline_line(rng, pos))
+
+
+def write_inflects(path, lines, seed = SEED):
+    rng = random.Random(seed)
+
+    with open(path, "w", encoding = jsonisator.SOURCE_ENCODING, newline = "\n") as inflects_file:
+        for pos in _pos_sequence(rng, INFLECTS_POS_COUNTS, lines):
+            chance = rng.random()
+
+            if chance < INFLECTS_COMMENTS:
+                inflects_file.write("--  " + " ".join(rng.choice(SENSE_WORDS) for _ in range(4)) + "\n")
+            elif chance < INFLECTS_COMMENTS + INFLECTS_BLANKS:
+                inflects_file.write("\n")
+            else:
+                inflects_file.write(inflects_line(rng, pos))
+
+
+def write_sources(directory, scale, seed = SEED):
+    # Writes DICTLINE.TXT and INFLECTS.txt of the given scale to the directory, returning their paths
+    directory = Path(directory)
+    directory.mkdir(parents = True, exist_ok = True)
+
+    dictline_path = directory / "DICTLINE.TXT"
+    inflects_path = directory / "INFLECTS.txt"
+
+    write_dictline(dictline_path, DICTLINE_LINES * scale, seed)
+    write_inflects(inflects_path, INFLECTS_LINES * scale, seed)
+
+    return dictline_path, inflects_path
+
+
+if __name__ == "__main__":
+    scale = int(sys.argv[1])
+    directory = Path(sys.argv[2]) if len(sys.argv) > 2 else Path("synthetic-" + str(scale))
+
+    for path in write_sources(directory, scale):
+        print(path)
@@ -0,0 +1,239 @@
+import struct
+import sys
+
+from pathlib import Path
+
+import jsonisator
+
+# A compact binary variant of DICTLINE.json.
+#
+# Most fields of a dictionary entry (pos, gender, age, area, geography, frequency, source, the *_kind fields etc.)
+# only ever take one of a handful of values. Instead of repeating them as strings in every entry, they are stored
+# once in a string table and each entry only refers to them by their number in that table. The stems and senses
+# are stored in a heap of strings (stems which repeat are only stored once) and each entry refers to them by their
+# offset and length within it.
+#
+# The entries themselves are kept in records of a fixed size, so any of them can be read without reading those
+# before it. The file is laid out as follows (all numbers are little-endian):
+#
+# - header (see HEADER)
+# - string table: number of strings (u16), followed by each string as its length (u8) and its UTF-8 bytes
+# - records (see RECORD): POS, stems, senses, the fields specific to the POS and the common fields
+# - heap of UTF-8 strings
+#
+# The fields each POS has (and therefore the meaning of the values in a record) are taken from
+# jsonisator.DICTLINE_SCHEMA, which is why the file also carries FORMAT_VERSION.
+
+BINARY_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "DICTLINE.bin"
+
+MAGIC = b"WWDICT"
+FORMAT_VERSION = 1
+
+# magic, format version, number of records, record size, offsets of the string table, records and heap
+HEADER = struct.Struct("<6sHIIIII")
+
+# Entries have at most this many stems and fields specific to their POS
+MAX_STEMS = jsonisator.MAX_STEMS
+MAX_FIELDS = max(len(fields) for _, _, fields in jsonisator.DICTLINE_SCHEMA.values())
+
+# POS (string table code), stems (heap offset and length each), senses (heap offset and length),
+# fields specific to the POS (a number or a string table code each) and the common fields (string table codes)
+RECORD = struct.Struct("<H" + "IB" * MAX_STEMS + "IH" + "i" * MAX_FIELDS + "H" * len(jsonisator.DICTLINE_COMMON_FIELDS))
+
+
+class BinaryWriter:
+    # Collects the entries given to add() and writes the binary dictionary once closed
+
+    def __init__(self, path = BINARY_PATH):
+        self.path = path
+        self.strings = {}
+        self.heap = bytearray()
+        self.heap_offsets = {}
+        self.records = bytearray()
+        self.count = 0
+
+    def _code(self, value):
+        code = self.strings.get(value)
+
+        if code is None:
+            code = self.strings[value] = len(self.strings)
+
+        return code
+
+    def _heap(self, value):
+        # Returns the offset and length of the string within the heap. Strings already there are reused.
+        offset = self.heap_offsets.get(value)
+        data = value.encode("utf-8")
+
+        if offset is None:
+            offset = self.heap_offsets[value] = len(self.heap)
+            self.heap += data
+
+        return offset, len(data)
+
+    def add(self, entry):
+        _, _, fields = jsonisator.DICTLINE_SCHEMA[entry["pos"]]
+
+        values = [self._code(entry["pos"])]
+
+        stems = entry["stems"]
+        for index in range(MAX_STEMS):
+            values.extend(self._heap(stems[index]) if index < len(stems) else (0, 0))
+
+        values.extend(self._heap(entry["senses"]))
+
+        for index in range(MAX_FIELDS):
+            if index >= len(fields):
+                values.append(0)
+            elif fields[index][1] is int:
+                values.append(entry[fields[index][0]])
+            else:
+                values.append(self._code(entry[fields[index][0]]))
+
+        values.extend(self._code(entry[name]) for name in jsonisator.DICTLINE_COMMON_FIELDS)
+
+        self.records += RECORD.pack(*values)
+        self.count += 1
+
+    def tobytes(self):
+        # The binary dictionary of the entries added so far
+        strings = bytearray(struct.pack("<H", len(self.strings)))
+
+        for value in self.strings:
+            data = value.encode("utf-8")
+            strings += struct.pack("<B", len(data)) + data
+
+        strings_offset = HEADER.size
+        records_offset = strings_offset + len(strings)
+        heap_offset = records_offset + len(self.records)
+
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, self.count, RECORD.size, strings_offset, records_offset, heap_offset)
+
+        return header + strings + self.records + self.heap
+
+    def close(self):
+        with open(self.path, "wb") as binary_file:
+            binary_file.write(self.tobytes())
+
+
+def write_binary(entries, path = BINARY_PATH):
+    writer = BinaryWriter(path)
+
+    for entry in entries:
+        writer.add(entry)
+
+    writer.close()
+
+
+class BinaryDictionary:
+    # Reads the entries of a binary dictionary held in any bytes-like object (bytes, mmap, shared memory etc.).
+    #
+    # Only the header, the string table and the heap are read up front: an entry is only decoded when it is
+    # asked for, so indexing is cheap no matter how large the dictionary is. With decode_heap set to False, not even
+    # the heap is: its strings are decoded straight from the buffer whenever an entry is, so nothing of the size of
+    # the dictionary is copied out of the buffer (see shared_dictionary.py).
+
+    def __init__(self, buffer, decode_heap = True):
+        self.buffer = memoryview(buffer)
+
+        magic, version, self.count, record_size, strings_offset, records_offset, heap_offset = HEADER.unpack_from(self.buffer, 0)
+
+        if magic != MAGIC:
+            raise ValueError("Not a binary dictionary file.")
+        if version != FORMAT_VERSION or record_size != RECORD.size:
+            raise ValueError("Unsupported binary dictionary version (" + str(version) + ").")
+
+        (string_count,) = struct.unpack_from("<H", self.buffer, strings_offset)
+        offset = strings_offset + 2
+
+        self.strings = []
+        for _ in range(string_count):
+            length = self.buffer[offset]
+            self.strings.append(sys.intern(str(self.buffer[offset + 1:offset + 1 + length], "utf-8")))
+            offset += 1 + length
+
+        self.records = self.buffer[records_offset:heap_offset]
+
+        # Offsets within the heap are in bytes. As long as the heap is pure ASCII (which it is for Whitaker's
+        # dictionary), they are just as well offsets within the decoded heap, which is then decoded only once.
+        self.heap = None
+
+        if decode_heap:
+            try:
+                self.heap = str(self.buffer[heap_offset:], "ascii")
+            except UnicodeDecodeError:
+                pass
+
+        if self.heap is None:
+            self.heap = _Heap(self.buffer[heap_offset:])
+
+        self.decoders = {}
+        for pos, (stem_count, _, fields) in jsonisator.DICTLINE_SCHEMA.items():
+            if pos in self.strings:
+                self.decoders[self.strings.index(pos)] = _compile_decoder(pos, stem_count, fields)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("entry index out of range")
+
+        values = RECORD.unpack_from(self.records, index * RECORD.size)
+        return self.decoders[values[0]](values, self.heap, self.strings)
+
+    def __iter__(self):
+        decoders, heap, strings = self.decoders, self.heap, self.strings
+
+        for values in RECORD.iter_unpack(self.records):
+            yield decoders[values[0]](values, heap, strings)
+
+
+class _Heap:
+    # Stands in for the decoded heap when it isn't pure ASCII, decoding only the strings which are asked for
+
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, key):
+        return str(self.data[key], "utf-8")
+
+
+def _compile_decoder(pos, stem_count, fields):
+    # Compiles the function turning the values of a record into an entry, in the same way as the extractors of
+    # jsonisator are compiled. Its arguments are the unpacked record, the heap and the string table.
+    def string(index):
+        return "heap[values[" + str(index) + "]:values[" + str(index) + "] + values[" + str(index + 1) + "]]"
+
+    stems = [string(1 + 2 * index) for index in range(stem_count)]
+    items = [("stems", "(" + ", ".join(stems) + ",)"), ("pos", repr(pos))]
+
+    specific = 3 + 2 * MAX_STEMS
+
+    for index, (name, convert) in enumerate(fields, specific):
+        value = "values[" + str(index) + "]"
+        items.append((name, value if convert is int else "strings[" + value + "]"))
+
+    for index, name in enumerate(jsonisator.DICTLINE_COMMON_FIELDS, specific + MAX_FIELDS):
+        items.append((name, "strings[values[" + str(index) + "]]"))
+
+    items.append(("senses", string(1 + 2 * MAX_STEMS)))
+
+    return jsonisator._compile_extractor("decode_" + pos.lower(), "values, heap, strings", items)
+
+
+def read_binary(path = BINARY_PATH):
+    # Loads all the entries of a binary dictionary file
+    return list(BinaryDictionary(Path(path).read_bytes()))
+
+
+if __name__ == "__main__":
+    # Converts an existing DICTLINE.json (or .ndjson) into the binary format:
+    #
+    #   python binary_format.py [DICTLINE.json] [DICTLINE.bin]
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else jsonisator.DICTLINE_JSON_PATH
+    target = Path(sys.argv[2]) if len(sys.argv) > 2 else BINARY_PATH
+
+    write_binary(jsonisator.iter_json(source), target)
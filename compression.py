@@ -0,0 +1,189 @@
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import jsonisator
+import shards
+
+# Precompressed variants of the JSON files (and their shards), so a static server can send them as they are with
+# the matching Content-Encoding, instead of compressing them on every request.
+#
+# Every file is compressed to FILE.gz (gzip) and FILE.xz (lzma) next to it. The files are compressed by a pool of
+# threads (zlib and lzma let go of the GIL while they compress) as soon as they are written, so DICTLINE is being
+# compressed while INFLECTS is converted. The gzip files carry no name or time, so the same file always gives the
+# same compressed file.
+#
+# The compressed files are written next to their final place first, and only moved there once complete, so an
+# interrupted run doesn't leave truncated ones behind. The size, SHA-256 and compression level of the file each was
+# made from (and its own size) are recorded in RECORDS_PATH. Incremental conversions (see incremental.py) leave the files which didn't
+# change as they are, so only the files whose compressed variants are missing or weren't made from them as they are
+# (at the same level) are compressed again.
+
+# Formats the files are compressed to: name -> (extension, function opening the compressed file for writing)
+FORMATS = {
+    "gzip": (".gz", lambda output_file, level: gzip.GzipFile(filename = "", mode = "wb", compresslevel = level, fileobj = output_file, mtime = 0)),
+    "lzma": (".xz", lambda output_file, level: lzma.LZMAFile(output_file, "wb", preset = level))
+}
+
+# Compression level, from 1 (quickest) to 9 (smallest) for both formats. Can also be set with --compression-level.
+LEVEL = 6
+
+THREADS = 4
+
+CHUNK_SIZE = 1 << 20
+
+RECORDS_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "COMPRESSED.json"
+
+
+def compressed_path(path, format_name):
+    return Path(str(path) + FORMATS[format_name][0])
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def load_records(path = RECORDS_PATH):
+    # Compressed path -> record of the file it was made from (see compress_file)
+    try:
+        with open(path) as records_file:
+            return json.load(records_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_records(records, path = RECORDS_PATH):
+    with open(path, "w") as records_file:
+        json.dump(records, records_file, indent = 4)
+
+
+def up_to_date(path, format_name, level, records):
+    # Whether the compressed variant of the file was made from it as it is now, at the same level
+    output_path = compressed_path(path, format_name)
+    record = records.get(str(output_path))
+
+    if record is None or record["level"] != level:
+        return False
+
+    try:
+        if os.path.getsize(output_path) != record.get("compressed_size") or os.path.getsize(path) != record["size"]:
+            return False
+
+        return _hash_file(path) == record["sha256"]
+    except OSError:
+        return False
+
+
+def compress_file(path, format_name, level = LEVEL):
+    # Compresses the file, returning (compressed path, format, size, compressed size, seconds, record of the file)
+    _, open_compressed = FORMATS[format_name]
+    path = Path(path)
+    output_path = compressed_path(path, format_name)
+    temporary_path = Path(str(output_path) + ".tmp")
+    digest = hashlib.sha256()
+    size = 0
+
+    start = time.perf_counter()
+
+    with open(path, "rb") as source_file, open(temporary_path, "wb") as output_file:
+        with open_compressed(output_file, level) as compressed_file:
+            for chunk in iter(lambda: source_file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                compressed_file.write(chunk)
+                size += len(chunk)
+
+    os.replace(temporary_path, output_path)
+
+    compressed_size = output_path.stat().st_size
+    record = {"size": size, "sha256": digest.hexdigest(), "level": level, "compressed_size": compressed_size}
+
+    return output_path, format_name, size, compressed_size, time.perf_counter() - start, record
+
+
+def _compress_stale(path, format_name, level, records):
+    # Run by the threads in incremental conversions, as checking the file takes hashing it
+    if up_to_date(path, format_name, level, records):
+        return None
+
+    return compress_file(path, format_name, level)
+
+
+class Compressor:
+    # Compresses the files given to add() in the background. close() waits for all of them, records what they were
+    # made from and returns the results. With only_stale, the files whose compressed variants are up to date (see
+    # up_to_date) are left as they are.
+
+    def __init__(self, level = LEVEL, formats = tuple(FORMATS), threads = THREADS, only_stale = False, records_path = RECORDS_PATH):
+        self.level = level
+        self.formats = formats
+        self.only_stale = only_stale
+        self.records_path = records_path
+        self.records = load_records(records_path)
+        self.executor = ThreadPoolExecutor(max_workers = threads)
+        self.futures = []
+
+    def add(self, path):
+        for format_name in self.formats:
+            if self.only_stale:
+                self.futures.append(self.executor.submit(_compress_stale, path, format_name, self.level, self.records))
+            else:
+                self.futures.append(self.executor.submit(compress_file, path, format_name, self.level))
+
+    def close(self):
+        self.executor.shutdown()
+        results = [result for result in (future.result() for future in self.futures) if result is not None]
+
+        for result in results:
+            self.records[str(result[0])] = result[5]
+
+        save_records(self.records, self.records_path)
+
+        return results
+
+
+def compressed_outputs(json_path, sharded = False):
+    # The JSON file along with its shards, if it was sharded (see shards.py)
+    paths = [json_path]
+
+    if not sharded:
+        return paths
+
+    directory = shards.SHARDS_DIRECTORY_PATH / Path(json_path).stem
+
+    try:
+        manifest = shards.load_manifest(directory)
+    except (OSError, ValueError):
+        return paths
+
+    return paths + [directory / shard["file"] for shard in manifest["shards"]]
+
+
+def format_compression(results):
+    size = {}
+    compressed_size = {}
+    seconds = {}
+
+    for _, format_name, original, compressed, elapsed, _ in results:
+        size[format_name] = size.get(format_name, 0) + original
+        compressed_size[format_name] = compressed_size.get(format_name, 0) + compressed
+        seconds[format_name] = seconds.get(format_name, 0) + elapsed
+
+    result = "\nCompressed " + str(len(results) // max(len(size), 1)) + " files.\n"
+
+    for format_name in size:
+        result += format_name + ": " + str(size[format_name]) + " to " + str(compressed_size[format_name]) + " bytes ("
+        result += str(round(size[format_name] / max(compressed_size[format_name], 1), 2)) + "x) in " + str(round(seconds[format_name], 2)) + " s (all files)\n"
+
+    return result
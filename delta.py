@@ -0,0 +1,216 @@
+import bisect
+import hashlib
+import json
+import sys
+
+from pathlib import Path
+
+import jsonisator
+
+# Deltas between two versions of DICTLINE.json, so clients holding the previous version don't have to download
+# all of the new one.
+#
+# Entries are matched between the versions by a key made of their stems, POS and declension/conjugation (with
+# variant), hashed down to KEY_SIZE bytes. Entries which share all of those are told apart by their order. As
+# the entries of both versions are looked up by their keys, making a delta takes linear time (plus sorting out
+# the entries which moved, see _moved).
+#
+# A delta is a JSON document of:
+#
+# - from/to: SHA-256 of the compact JSON of the old and the new entries, which apply_delta() checks
+# - removed: keys of the old entries which are gone
+# - modified: key -> new entry, for entries whose key stayed the same but whose other fields changed
+# - added: [position, entry] of every new entry, by its position within the new entries
+#
+# Deltas are saved to output/deltas/, named after the versions they lead from and to.
+
+DELTA_DIRECTORY_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "deltas"
+
+FORMAT_VERSION = 1
+
+# Bytes of the hashed keys
+KEY_SIZE = 8
+
+KEY_FIELDS = ("pos", "declension", "declension_variant", "conjugation", "conjugation_variant")
+
+
+def _key_text(entry):
+    return "\t".join(entry["stems"]) + "\t" + "\t".join(str(entry.get(name, "")) for name in KEY_FIELDS)
+
+
+def keys(entries):
+    # Returns the hashed key of every entry. Entries with the same stems, POS and class are numbered in order.
+    seen = {}
+    found = []
+
+    for entry in entries:
+        text = _key_text(entry)
+        occurrence = seen[text] = seen.get(text, -1) + 1
+
+        found.append(hashlib.blake2b((text + "\t" + str(occurrence)).encode("utf-8"), digest_size = KEY_SIZE).hexdigest())
+
+    return found
+
+
+def _same(old_entry, new_entry):
+    # Entries fresh from the parser hold their stems in a tuple rather than a list, as those loaded from JSON do
+    return old_entry.keys() == new_entry.keys() and all(
+        list(value) == list(new_entry[name]) if name == "stems" else value == new_entry[name]
+        for name, value in old_entry.items()
+    )
+
+
+def version(entries):
+    # SHA-256 of the entries as they are saved in a compact DICTLINE.json
+    return hashlib.sha256(json.dumps(entries, separators = (',', ':')).encode("utf-8")).hexdigest()
+
+
+def _moved(order):
+    # Given the old positions of the kept entries in their new order, returns the positions (within order) of the
+    # entries which have to be treated as moved. Those are all but a longest increasing run of old positions, so
+    # the rest keep their relative order. Patience sorting, O(n log n).
+    tails = []
+    tail_indexes = []
+    previous = [-1] * len(order)
+
+    for index, value in enumerate(order):
+        position = bisect.bisect_left(tails, value)
+
+        if position == len(tails):
+            tails.append(value)
+            tail_indexes.append(index)
+        else:
+            tails[position] = value
+            tail_indexes[position] = index
+
+        previous[index] = tail_indexes[position - 1] if position > 0 else -1
+
+    kept = set()
+    index = tail_indexes[-1] if tail_indexes else -1
+
+    while index != -1:
+        kept.add(index)
+        index = previous[index]
+
+    return [index for index in range(len(order)) if index not in kept]
+
+
+def make_delta(old_entries, new_entries):
+    old_keys = keys(old_entries)
+    new_keys = keys(new_entries)
+
+    old_positions = {key: position for position, key in enumerate(old_keys)}
+    new_key_set = set(new_keys)
+
+    removed = [key for key in old_keys if key not in new_key_set]
+    modified = {}
+    added = []
+
+    # Entries found in both versions, in their new order
+    kept = [position for position, key in enumerate(new_keys) if key in old_positions]
+    order = [old_positions[new_keys[position]] for position in kept]
+
+    moved = set(kept[index] for index in _moved(order))
+
+    for position, key in enumerate(new_keys):
+        if key not in old_positions:
+            added.append([position, new_entries[position]])
+        elif position in moved:
+            removed.append(key)
+            added.append([position, new_entries[position]])
+        elif not _same(old_entries[old_positions[key]], new_entries[position]):
+            modified[key] = new_entries[position]
+
+    return {
+        "format": FORMAT_VERSION,
+        "from": version(old_entries),
+        "to": version(new_entries),
+        "removed": removed,
+        "modified": modified,
+        "added": added
+    }
+
+
+def apply_delta(old_entries, delta, verify = True):
+    # Returns the new entries, given the old ones and the delta leading from them
+    if delta["format"] != FORMAT_VERSION:
+        raise ValueError("Unsupported delta version (" + str(delta["format"]) + ").")
+    if verify and version(old_entries) != delta["from"]:
+        raise ValueError("The delta does not apply to these entries.")
+
+    removed = set(delta["removed"])
+    modified = delta["modified"]
+
+    kept = [
+        modified.get(key, entry)
+        for key, entry in zip(keys(old_entries), old_entries)
+        if key not in removed
+    ]
+
+    # The added entries are slotted in between the kept ones, at their positions within the new entries
+    new_entries = []
+    kept_entries = iter(kept)
+    added = iter(delta["added"])
+    next_added = next(added, None)
+
+    for position in range(len(kept) + len(delta["added"])):
+        if next_added is not None and next_added[0] == position:
+            new_entries.append(next_added[1])
+            next_added = next(added, None)
+        else:
+            new_entries.append(next(kept_entries))
+
+    if verify and version(new_entries) != delta["to"]:
+        raise ValueError("Applying the delta did not give the expected entries.")
+
+    return new_entries
+
+
+def delta_path(delta, directory = DELTA_DIRECTORY_PATH):
+    return Path(directory) / ("DICTLINE-" + delta["from"][:12] + "-" + delta["to"][:12] + ".json")
+
+
+def save_delta(delta, directory = DELTA_DIRECTORY_PATH):
+    Path(directory).mkdir(exist_ok = True)
+    path = delta_path(delta, directory)
+
+    with open(path, "w") as delta_file:
+        json.dump(delta, delta_file, separators = (',', ':'))
+
+    return path
+
+
+class DeltaWriter:
+    # Makes the delta from the existing DICTLINE.json (read as soon as the writer is made, before it is written
+    # again) to the entries given to add()
+
+    def __init__(self, path):
+        self.old_entries = jsonisator.load_json(path) if Path(path).exists() else None
+        self.entries = []
+
+    def add(self, entry):
+        if self.old_entries is not None:
+            self.entries.append(entry)
+
+    def close(self):
+        if self.old_entries is None:
+            return
+
+        delta = make_delta(self.old_entries, self.entries)
+
+        if delta["from"] != delta["to"]:
+            save_delta(delta)
+
+
+if __name__ == "__main__":
+    # Makes the delta between two versions of DICTLINE.json, or applies one:
+    #
+    #   python delta.py OLD.json NEW.json
+    #   python delta.py --apply OLD.json DELTA.json NEW.json
+    if sys.argv[1] == "--apply":
+        with open(sys.argv[3]) as delta_file:
+            entries = apply_delta(jsonisator.load_json(sys.argv[2]), json.load(delta_file))
+
+        jsonisator.write_json(entries, Path(sys.argv[4]), compact = True, ndjson = False)
+    else:
+        print(save_delta(make_delta(jsonisator.load_json(sys.argv[1]), jsonisator.load_json(sys.argv[2]))))
@@ -0,0 +1,238 @@
+import argparse
+import itertools
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import jsonisator
+import paradigms
+
+# A table of every inflected form of the dictionary (as generated by paradigms.py), so a form is analysed by a
+# single hash lookup instead of splitting it into stems and endings. It trades size and build time for latency.
+#
+# The table is a hash table saved as a file, which is memory-mapped and queried in place. Forms are hashed by
+# their CRC-32 into a power of two buckets, and the records of each bucket are kept together, so a lookup reads
+# the bounds of its bucket and compares the handful of records within. The file is laid out as follows (all
+# numbers are little-endian):
+#
+# - header (see HEADER)
+# - buckets: number of the first record of every bucket (u32 each), followed by the number of records
+# - records, grouped by bucket: the form (u32 each), then the entry (u32 each), then the inflection (u16 each)
+# - forms: offset of every distinct form within the heap (u32 each), followed by the size of the heap
+# - heap of UTF-8 forms
+#
+# Forms are kept in lower case, the same way as analysis.py compares them.
+
+FORM_INDEX_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "FORMS.idx"
+
+MAGIC = b"WWFORM"
+FORMAT_VERSION = 1
+
+# magic, format version, number of buckets, records and distinct forms, offsets of the buckets, records, forms and heap
+HEADER = struct.Struct("<6sHIIIIIII")
+
+# Number of processes generating the forms (can also be set with --workers) and number of entries handed to a
+# worker at once
+WORKERS = 1
+CHUNK_SIZE = 2000
+
+
+#################################
+#             Build             #
+#################################
+
+_worker_paradigms = None
+
+
+def _load_worker(inflections):
+    # Run once by every worker process
+    global _worker_paradigms
+    _worker_paradigms = paradigms.Paradigms(inflections)
+
+
+def _generate(entries, first):
+    # Run by the worker processes. Returns the forms of the entries (joined by newlines) along with their entries
+    # and inflections, which are much quicker to hand back than a list of tuples.
+    forms = []
+    numbers = array("I")
+    inflections = array("H")
+
+    for number, entry in enumerate(entries, first):
+        for form, inflection in _worker_paradigms.generate_forms(entry):
+            forms.append(form)
+            numbers.append(number)
+            inflections.append(inflection)
+
+    return "\n".join(forms).lower(), numbers, inflections
+
+
+def _generate_all(entries, inflections, workers):
+    # Yields the results of _generate for every chunk of the entries, in order
+    chunks = [(entries[first:first + CHUNK_SIZE], first) for first in range(0, len(entries), CHUNK_SIZE)]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers = workers, initializer = _load_worker, initargs = (inflections,)) as executor:
+            yield from executor.map(_generate, *zip(*chunks))
+    else:
+        _load_worker(inflections)
+        for chunk, first in chunks:
+            yield _generate(chunk, first)
+
+
+def _little_endian(column):
+    if struct.pack("=H", 1) != struct.pack("<H", 1):
+        column = array(column.typecode, column)
+        column.byteswap()
+
+    return column.tobytes()
+
+
+def build_form_index(entries, inflections, path = FORM_INDEX_PATH, workers = WORKERS):
+    # Builds the table of forms of the entries and saves it. Returns the number of records.
+    #
+    # Everything past generating the forms is done a column at a time (map, sorted etc.), rather than a record at
+    # a time, as there are millions of records.
+    forms = []
+    numbers = array("I")
+    inflection_numbers = array("H")
+
+    for chunk_forms, chunk_numbers, chunk_inflections in _generate_all(entries, inflections, workers):
+        if chunk_forms:
+            forms.extend(chunk_forms.split("\n"))
+            numbers.extend(chunk_numbers)
+            inflection_numbers.extend(chunk_inflections)
+
+    # Number every distinct form, in the order they first occur
+    form_ids = {}
+    record_forms = array("I", [form_ids.setdefault(form, len(form_ids)) for form in forms])
+    encoded = [form.encode("utf-8") for form in form_ids]
+    heap = b"".join(encoded)
+    heap_offsets = array("I", itertools.accumulate(map(len, encoded), initial = 0))
+
+    # At least as many buckets as distinct forms, so most buckets hold a single form
+    bucket_count = 1
+    while bucket_count < len(form_ids):
+        bucket_count *= 2
+
+    form_buckets = array("I", map((bucket_count - 1).__and__, map(zlib.crc32, encoded)))
+    record_buckets = array("I", map(form_buckets.__getitem__, record_forms))
+
+    # The records sorted by bucket (the sort is stable, so they stay in the order of the entries within a bucket)
+    order = sorted(range(len(record_forms)), key = record_buckets.__getitem__)
+
+    counts = array("I", bytes(4 * bucket_count))
+    for bucket in record_buckets:
+        counts[bucket] += 1
+    starts = array("I", itertools.accumulate(counts, initial = 0))
+
+    columns = [
+        array("I", map(record_forms.__getitem__, order)),
+        array("I", map(numbers.__getitem__, order)),
+        array("H", map(inflection_numbers.__getitem__, order))
+    ]
+
+    buckets_offset = HEADER.size
+    records_offset = buckets_offset + len(starts) * 4
+    forms_offset = records_offset + len(order) * 10
+    heap_offset = forms_offset + len(heap_offsets) * 4
+
+    with open(path, "wb") as index_file:
+        index_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, bucket_count, len(order), len(form_ids), buckets_offset, records_offset, forms_offset, heap_offset))
+        index_file.write(_little_endian(starts))
+
+        for column in columns:
+            index_file.write(_little_endian(column))
+
+        index_file.write(_little_endian(heap_offsets))
+        index_file.write(heap)
+
+    return len(order)
+
+
+#################################
+#            Lookup             #
+#################################
+
+class FormIndex:
+    # Memory-mapped table of forms. Opening it only reads the header, lookups only the pages they need.
+
+    def __init__(self, path = FORM_INDEX_PATH):
+        with open(path, "rb") as index_file:
+            self.buffer = mmap.mmap(index_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        magic, version, bucket_count, self.count, _, self.buckets_offset, records_offset, self.forms_offset, self.heap_offset = HEADER.unpack_from(self.buffer, 0)
+
+        if magic != MAGIC:
+            raise ValueError("Not a form index file.")
+        if version != FORMAT_VERSION:
+            raise ValueError("Unsupported form index version (" + str(version) + ").")
+
+        self.mask = bucket_count - 1
+
+        # Offsets of the columns of the records
+        self.record_forms = records_offset
+        self.record_entries = records_offset + 4 * self.count
+        self.record_inflections = records_offset + 8 * self.count
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.buffer.close()
+
+    def lookup(self, form):
+        # Returns (entry, inflection) for every way of reading the form
+        data = form.lower().encode("utf-8")
+        buffer = self.buffer
+
+        start, end = struct.unpack_from("<II", buffer, self.buckets_offset + (zlib.crc32(data) & self.mask) * 4)
+        found = []
+
+        for record in range(start, end):
+            (form_id,) = struct.unpack_from("<I", buffer, self.record_forms + 4 * record)
+            heap_start, heap_end = struct.unpack_from("<II", buffer, self.forms_offset + 4 * form_id)
+
+            if buffer[self.heap_offset + heap_start:self.heap_offset + heap_end] == data:
+                (entry,) = struct.unpack_from("<I", buffer, self.record_entries + 4 * record)
+                (inflection,) = struct.unpack_from("<H", buffer, self.record_inflections + 2 * record)
+                found.append((entry, inflection))
+
+        return found
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description = "Builds the table of every inflected form of the dictionary.")
+    parser.add_argument("--dictline", default = jsonisator.DICTLINE_JSON_PATH, help = "converted DICTLINE to read")
+    parser.add_argument("--inflects", default = jsonisator.INFLECTS_JSON_PATH, help = "converted INFLECTS to read")
+    parser.add_argument("--output", default = FORM_INDEX_PATH, help = "table of forms to write")
+    parser.add_argument("--workers", type = int, default = WORKERS, help = "number of processes generating the forms")
+
+    arguments = parser.parse_args()
+
+    if arguments.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    return arguments
+
+
+def main():
+    arguments = parse_arguments()
+
+    entries = jsonisator.load_json(arguments.dictline)
+    inflections = jsonisator.load_json(arguments.inflects)
+
+    start = time.perf_counter()
+    count = build_form_index(entries, inflections, arguments.output, arguments.workers)
+    elapsed = time.perf_counter() - start
+
+    print("Built the table of " + str(count) + " forms of " + str(len(entries)) + " entries in " + str(round(elapsed, 2)) + " s ("
+          + str(round(os.path.getsize(arguments.output) / 1000000, 1)) + " MB).")
+
+
+if __name__ == "__main__":
+    main()
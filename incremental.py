@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import zlib
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import jsonisator
+import random_access
+
+# Incremental regeneration of the JSON files.
+#
+# The manifest (output/MANIFEST.json) records, for every JSON file, the hash of the source it was made from, the
+# settings it was made with, the hashes of the extra outputs made along with it and the version of the converter
+# (and of the modules making the extra outputs). A JSON file which is still up to date, and whose extra outputs are
+# all still there as they were made, isn't made again at all: its report is put together from the manifest.
+#
+# When the source did change, only part of it usually did. The source is split into blocks of lines, and the
+# manifest also keeps the hash of each block along with the number of entries it gave (and its report). Blocks
+# whose hash is known are not parsed again: their entries are copied from the existing JSON file as they are,
+# which is where the offsets file of random_access.py comes in. Only the blocks which changed are parsed.
+#
+# Blocks end after lines whose CRC happens to be divisible by BLOCK_LINES, rather than every BLOCK_LINES lines.
+# That way inserting or removing lines only changes the block they are in, instead of shifting all the blocks
+# which follow.
+
+MANIFEST_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "MANIFEST.json"
+
+# Average and largest number of lines in a block
+BLOCK_LINES = 256
+MAX_BLOCK_LINES = 4 * BLOCK_LINES
+
+# Modules whose changes can change the output, along with jsonisator itself
+CONVERTER_MODULES = ("random_access", "binary_format", "indexes", "sqlite_export", "delta", "shards")
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(1 << 20), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _hash_block(lines):
+    return hashlib.blake2b("".join(lines).encode(jsonisator.SOURCE_ENCODING), digest_size = 16).hexdigest()
+
+
+def converter_version():
+    # The manifest is only trusted if it was made by the very same converter and writers of the extra outputs
+    digest = hashlib.sha256()
+
+    for path in [Path(jsonisator.__file__)] + [Path(jsonisator.__file__).with_name(name + ".py") for name in CONVERTER_MODULES]:
+        digest.update(_hash_file(path).encode("ascii"))
+
+    return str(jsonisator.CONVERTER_VERSION) + ":" + digest.hexdigest()[:16]
+
+
+def split_blocks(lines):
+    blocks = []
+    block = []
+
+    for line in lines:
+        block.append(line)
+
+        if zlib.crc32(line.encode(jsonisator.SOURCE_ENCODING)) % BLOCK_LINES == 0 or len(block) >= MAX_BLOCK_LINES:
+            blocks.append(block)
+            block = []
+
+    if block:
+        blocks.append(block)
+
+    return blocks
+
+
+def load_manifest(path = MANIFEST_PATH):
+    try:
+        with open(path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {"converter": None, "files": {}}
+
+    if manifest.get("converter") != converter_version():
+        return {"converter": None, "files": {}}
+
+    return manifest
+
+
+def save_manifest(manifest, path = MANIFEST_PATH):
+    manifest["converter"] = converter_version()
+
+    with open(path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent = 4)
+
+
+def _report(blocks):
+    report = jsonisator.ParseReport()
+
+    for block in blocks:
+        block_report = jsonisator.ParseReport()
+        block_report.counts = block["counts"]
+        block_report.errors = block["errors"]
+        report.merge(block_report)
+
+    return report
+
+
+def _parse_block(parse_lines, lines):
+    # Run by the worker processes, if there are any
+    report = jsonisator.ParseReport()
+    entries = list(parse_lines(lines, report))
+
+    return entries, report
+
+
+def _parse_blocks(blocks, parse_lines, workers):
+    # Yields (entries, report) of each block, in order
+    if workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            yield from executor.map(_parse_block, [parse_lines] * len(blocks), blocks)
+    else:
+        for block in blocks:
+            yield _parse_block(parse_lines, block)
+
+
+def _hash_outputs(paths):
+    # Path -> hash of each of the files, or None for those which are missing
+    return {str(path): _hash_file(path) if os.path.exists(path) else None for path in paths}
+
+
+def _previous(manifest, json_path, index_path, settings):
+    # The manifest record of the JSON file, if its blocks can still be reused
+    previous = manifest["files"].get(Path(json_path).name)
+
+    if previous is None or previous["settings"] != settings:
+        return None
+    if not os.path.exists(json_path) or not os.path.exists(index_path):
+        return None
+    if _hash_file(json_path) != previous["output"] or _hash_file(index_path) != previous["index"]:
+        return None
+
+    return previous
+
+
+def convert(source_path, json_path, parse_lines, make_writers, outputs = (), ndjson = jsonisator.NDJSON, workers = 1, settings = None, output_paths = None):
+    # Brings the JSON file (and the offsets file next to it) up to date with its source, and returns the report.
+    #
+    # parse_lines is jsonisator._parse_dictline_lines or jsonisator._parse_inflects_lines. make_writers returns the
+    # extra writers (see jsonisator.feed), whose names are given as outputs: they are only made if the JSON file
+    # has to be made again, or if they weren't made along with it the last time. settings are those of the extra
+    # writers, which have to be the same as the last time for anything to be reused. output_paths returns the files
+    # the extra writers make (see jsonisator.extra_output_paths), which are made again if any of them is missing or
+    # changed since.
+    if output_paths is None:
+        output_paths = lambda: []
+
+    manifest = load_manifest()
+    index_path = random_access.offsets_path(json_path)
+    settings = dict(settings or {}, compact = jsonisator.COMPACT_JSON, ndjson = ndjson)
+    source_hash = _hash_file(source_path)
+
+    previous = _previous(manifest, json_path, index_path, settings)
+
+    if previous is not None and previous["source"] == source_hash and previous["outputs"] == sorted(outputs) and previous["extras"] == _hash_outputs(output_paths()):
+        return _report(previous["blocks"])
+
+    with open(source_path, encoding = jsonisator.SOURCE_ENCODING) as source_file:
+        blocks = split_blocks(source_file)
+
+    hashes = [_hash_block(block) for block in blocks]
+
+    # Block hash -> (number of its first entry within the existing JSON file, its manifest record)
+    known = {}
+
+    if previous is not None:
+        existing = random_access.RandomAccessFile(json_path, index_path)
+        first = 0
+
+        for record in previous["blocks"]:
+            known.setdefault(record["hash"], (first, record))
+            first += record["count"]
+
+    parsed = _parse_blocks([block for block, block_hash in zip(blocks, hashes) if block_hash not in known], parse_lines, workers)
+
+    # Extra outputs shared with the other JSON files (such as the SQLite database, which holds the tables of both)
+    # are written over by each of them, so their records are brought up to date along with this one's, unless they
+    # were already out of date. They are hashed now, as some of the writers start writing as soon as they are made.
+    others = [record for name, record in manifest["files"].items() if name != Path(json_path).name]
+    shared = _hash_outputs(set(path for record in others for path in record["extras"]) & set(str(path) for path in output_paths()))
+
+    writers = make_writers()
+    records = []
+    encode = jsonisator.json_encoder(jsonisator.COMPACT_JSON, ndjson)
+
+    def texts():
+        for block_hash in hashes:
+            if block_hash in known:
+                first, record = known[block_hash]
+
+                for number in range(first, first + record["count"]):
+                    text = existing.text(number)
+
+                    if writers:
+                        entry = json.loads(text)
+                        for writer in writers:
+                            writer.add(entry)
+
+                    yield text
+
+                records.append(record)
+            else:
+                entries, report = next(parsed)
+
+                for entry in entries:
+                    for writer in writers:
+                        writer.add(entry)
+
+                    yield encode(entry)
+
+                records.append({"hash": block_hash, "count": len(entries), "counts": report.counts, "errors": report.errors})
+
+    # Written next to the existing files first, as the entries of those are still being copied
+    new_json_path = Path(str(json_path) + ".new")
+    new_index_path = Path(str(index_path) + ".new")
+
+    offsets = random_access.OffsetIndexWriter(new_index_path, new_json_path)
+    jsonisator.write_json_texts(texts(), new_json_path, jsonisator.COMPACT_JSON, ndjson, offsets)
+    offsets.close()
+
+    if previous is not None:
+        existing.close()
+
+    os.replace(new_json_path, json_path)
+    os.replace(new_index_path, index_path)
+
+    # Closed only once the JSON file is in place, as some of them record its hash
+    for writer in writers:
+        writer.close()
+
+    extras = _hash_outputs(output_paths())
+
+    for record in others:
+        for path, digest in record["extras"].items():
+            if path in shared and shared[path] == digest:
+                record["extras"][path] = extras.get(path)
+
+    manifest["files"][Path(json_path).name] = {
+        "source": source_hash,
+        "settings": settings,
+        "outputs": sorted(outputs),
+        "extras": extras,
+        "output": _hash_file(json_path),
+        "index": _hash_file(index_path),
+        "blocks": records
+    }
+    save_manifest(manifest)
+
+    return _report(records)
@@ -0,0 +1,529 @@
+import bisect
+import heapq
+import json
+import mmap
+import os
+import re
+import struct
+
+import jsonisator
+import random_access
+
+from jsonisator import NO_STEM
+
+# Lookup indexes built next to the JSON files, so the dictionary can be searched without loading all of it.
+#
+# They all share the same file format: a sorted table of keys, each pointing to its run of postings (fixed-size
+# tuples of numbers, such as the number of a record and the stem it was found in). The file is memory-mapped
+# and the table of keys is binary searched in place, so opening an index costs next to nothing and a lookup
+# only reads the handful of pages it needs. The file is laid out as follows (all numbers are little-endian):
+#
+# - header (see HEADER), which also carries the struct format of the postings and the flags of the index (settings
+#   the keys were made with, which the index has to be read with)
+# - keys (see KEY): offset and length of the key within the heap, and the first and number of its postings
+# - postings, grouped by key
+# - heap of UTF-8 keys
+#
+# Keys are sorted by their UTF-8 bytes, so prefix queries are just a range of the table.
+#
+# The postings refer to records by their position within the JSON file the index was built along with, whose hash is
+# recorded in the header (see random_access.content_hash). Opening an index along with that file checks it still has
+# that hash, so an index left over from before the file was written again (without the index) is refused rather than
+# giving the wrong records.
+
+STEM_INDEX_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "DICTLINE.stems.idx"
+
+MAGIC = b"WWKEYS"
+FORMAT_VERSION = 4
+
+# magic, format version, posting format, number of keys, offsets of the keys, postings and heap, hash of the JSON
+# file, flags
+HEADER = struct.Struct("<6sH8sIIII16sH")
+
+# heap offset, key length, first posting, number of postings
+KEY = struct.Struct("<IHII")
+
+
+class KeyIndexWriter:
+    # Collects (key, posting) pairs and writes them as a key index once closed, which has to be after the JSON file
+    # at json_path was written
+
+    def __init__(self, path, posting_format, json_path, flags = 0):
+        self.path = path
+        self.json_path = json_path
+        self.flags = flags
+        self.posting = struct.Struct(posting_format)
+        self.keys = {}
+
+    def add(self, key, posting):
+        self.keys.setdefault(key, []).append(posting)
+
+    def close(self):
+        keys = sorted((key.encode("utf-8"), postings) for key, postings in self.keys.items())
+
+        key_table = bytearray()
+        posting_table = bytearray()
+        heap = bytearray()
+        posting_count = 0
+
+        for key, postings in keys:
+            key_table += KEY.pack(len(heap), len(key), posting_count, len(postings))
+            heap += key
+
+            for posting in postings:
+                posting_table += self.posting.pack(*posting)
+            posting_count += len(postings)
+
+        keys_offset = HEADER.size
+        postings_offset = keys_offset + len(key_table)
+        heap_offset = postings_offset + len(posting_table)
+
+        with open(self.path, "wb") as index_file:
+            index_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.posting.format.encode("ascii"), len(keys), keys_offset, postings_offset, heap_offset, random_access.file_hash(self.json_path), self.flags))
+            index_file.write(key_table)
+            index_file.write(posting_table)
+            index_file.write(heap)
+
+
+class KeyIndex:
+    # Memory-mapped key index. Lookups binary search the table of keys within the file itself. If json_path is given,
+    # the index is only opened if it was built along with that file as it is now.
+
+    def __init__(self, path, json_path = None):
+        with open(path, "rb") as index_file:
+            self.buffer = mmap.mmap(index_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        magic, version, posting_format, self.count, self.keys_offset, self.postings_offset, self.heap_offset, json_hash, self.flags = HEADER.unpack_from(self.buffer, 0)
+
+        if magic != MAGIC:
+            raise ValueError("Not an index file.")
+        if version != FORMAT_VERSION:
+            raise ValueError("Unsupported index version (" + str(version) + ").")
+        if json_path is not None and json_hash != random_access.file_hash(json_path):
+            raise ValueError("The index doesn't match " + os.path.basename(json_path) + ", which was written again since (save the index along with it).")
+
+        self.posting = struct.Struct(posting_format.rstrip(b"\0").decode("ascii"))
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.buffer.close()
+
+    def _entry(self, index):
+        return KEY.unpack_from(self.buffer, self.keys_offset + index * KEY.size)
+
+    def key(self, index):
+        offset, length, _, _ = self._entry(index)
+        start = self.heap_offset + offset
+        return self.buffer[start:start + length]
+
+    def postings(self, index):
+        _, _, first, count = self._entry(index)
+        start = self.postings_offset + first * self.posting.size
+        return list(self.posting.iter_unpack(self.buffer[start:start + count * self.posting.size]))
+
+    def _find(self, key):
+        # Position of the first key not smaller than the given one
+        return bisect.bisect_left(_Keys(self), key.encode("utf-8"))
+
+    def get(self, key):
+        # Postings of the key, or an empty list if the index doesn't have it
+        index = self._find(key)
+
+        if index < self.count and self.key(index) == key.encode("utf-8"):
+            return self.postings(index)
+
+        return []
+
+    def prefix(self, prefix):
+        # Yields (key, postings) for every key starting with the prefix, in sorted order
+        encoded = prefix.encode("utf-8")
+
+        for index in range(self._find(prefix), self.count):
+            key = self.key(index)
+
+            if not key.startswith(encoded):
+                break
+
+            yield key.decode("utf-8"), self.postings(index)
+
+
+class _Keys:
+    # Lets bisect search the table of keys of an index as if it were a list
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return self.index.count
+
+    def __getitem__(self, position):
+        return self.index.key(position)
+
+
+#################################
+#          Stem index           #
+#################################
+
+# Postings of the stem index: number of the record (its position within DICTLINE.json) and the number of the stem
+# (starting with 1, the same way as the "stem" of an inflection refers to the stems of an entry)
+STEM_POSTING = "<IB"
+
+
+class StemIndexWriter:
+    # Builds the stem index from the dictionary entries, given in the order they are saved in
+
+    def __init__(self, path = STEM_INDEX_PATH, json_path = jsonisator.DICTLINE_JSON_PATH):
+        self.writer = KeyIndexWriter(path, STEM_POSTING, json_path)
+        self.record = 0
+
+    def add(self, entry):
+        for slot, stem in enumerate(entry["stems"], 1):
+            if stem != NO_STEM:
+                self.writer.add(stem, (self.record, slot))
+
+        self.record += 1
+
+    def close(self):
+        self.writer.close()
+
+
+class StemIndex(KeyIndex):
+    # Looks up the records in which a stem occurs, as a list of (record, stem number) pairs
+
+    def __init__(self, path = STEM_INDEX_PATH, json_path = jsonisator.DICTLINE_JSON_PATH):
+        super().__init__(path, json_path)
+
+    def lookup(self, stem):
+        return self.get(stem)
+
+
+#################################
+#         Ending index          #
+#################################
+
+ENDING_INDEX_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "INFLECTS.endings.json"
+
+# Fields by which the inflections sharing an ending are grouped, whichever of them an inflection has
+ENDING_GROUP_FIELDS = ("pos", "declension", "declension_variant", "conjugation", "conjugation_variant", "stem")
+
+
+def _ending_groups(inflections):
+    # Maps each ending to the groups of inflections having it. Every group is a dictionary of the fields in
+    # ENDING_GROUP_FIELDS along with the numbers of the inflections (their positions within INFLECTS.json).
+    # NO_ENDING is keyed as an empty ending, as that is what it is.
+    endings = {}
+
+    for number, inflection in enumerate(inflections):
+        ending = "" if inflection["ending"] == jsonisator.NO_ENDING else inflection["ending"]
+        key = tuple((name, inflection[name]) for name in ENDING_GROUP_FIELDS if name in inflection)
+
+        groups = endings.setdefault(ending, {})
+        groups.setdefault(key, []).append(number)
+
+    # Sorted by the reversed ending, so endings sharing their last letters are listed together
+    return {
+        ending: [dict(key, inflections = numbers) for key, numbers in groups.items()]
+        for ending, groups in sorted(endings.items(), key = lambda item: item[0][::-1])
+    }
+
+
+class EndingIndexWriter:
+    # Builds the ending index from the inflections, given in the order they are saved in
+
+    def __init__(self, path = ENDING_INDEX_PATH):
+        self.path = path
+        self.inflections = []
+
+    def add(self, inflection):
+        self.inflections.append(inflection)
+
+    def close(self):
+        with open(self.path, "w") as index_file:
+            if jsonisator.COMPACT_JSON:
+                json.dump(_ending_groups(self.inflections), index_file, separators = (',', ':'))
+            else:
+                json.dump(_ending_groups(self.inflections), index_file, indent = 4)
+
+
+class EndingIndex:
+    # Finds every ending which is a suffix of a word. The endings are kept in a trie of their reversed letters,
+    # so all of them come out of a single walk from the last letter of the word back.
+
+    def __init__(self, endings):
+        # Each node is a dictionary of the next (preceding) letters, while the groups of the ending which ends
+        # at the node are kept under None
+        self.root = {}
+
+        for ending, groups in endings.items():
+            node = self.root
+            for letter in reversed(ending):
+                node = node.setdefault(letter, {})
+            node[None] = groups
+
+    @classmethod
+    def from_inflections(cls, inflections):
+        return cls(_ending_groups(inflections))
+
+    @classmethod
+    def load(cls, path = ENDING_INDEX_PATH):
+        with open(path) as index_file:
+            return cls(json.load(index_file))
+
+    def endings(self, word):
+        # Returns (ending, groups) for every ending the word could have, from the shortest (no ending at all)
+        # to the longest
+        node = self.root
+        found = []
+
+        if None in node:
+            found.append(("", node[None]))
+
+        for position in range(len(word) - 1, -1, -1):
+            node = node.get(word[position])
+
+            if node is None:
+                break
+
+            if None in node:
+                found.append((word[position:], node[None]))
+
+        return found
+
+
+#################################
+#     Normalized stem index     #
+#################################
+
+NORMALIZED_INDEX_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "DICTLINE.normalized.idx"
+
+# Also fold the diphthongs ae and oe into e (as medieval spelling does). The setting is saved in the flags of the
+# index (as FOLD_DIPHTHONGS_FLAG), which is read with the setting it was saved with.
+FOLD_DIPHTHONGS = False
+FOLD_DIPHTHONGS_FLAG = 1
+
+# Classical spelling doesn't tell i from j and u from v, while texts often do
+ORTHOGRAPHY = str.maketrans("jv", "iu")
+
+
+def normalize(word, fold_diphthongs = FOLD_DIPHTHONGS):
+    word = word.lower().translate(ORTHOGRAPHY)
+
+    if fold_diphthongs:
+        word = word.replace("ae", "e").replace("oe", "e")
+
+    return word
+
+
+class NormalizedStemIndexWriter:
+    # Builds the stem index with every stem normalized (see normalize), so it can be looked up however the word was
+    # spelled
+
+    def __init__(self, path = NORMALIZED_INDEX_PATH, json_path = jsonisator.DICTLINE_JSON_PATH, fold_diphthongs = FOLD_DIPHTHONGS):
+        self.writer = KeyIndexWriter(path, STEM_POSTING, json_path, FOLD_DIPHTHONGS_FLAG if fold_diphthongs else 0)
+        self.fold_diphthongs = fold_diphthongs
+        self.record = 0
+
+    def add(self, entry):
+        for slot, stem in enumerate(entry["stems"], 1):
+            if stem != NO_STEM:
+                self.writer.add(normalize(stem, self.fold_diphthongs), (self.record, slot))
+
+        self.record += 1
+
+    def close(self):
+        self.writer.close()
+
+
+class NormalizedStemIndex(KeyIndex):
+    # Looks up the records in which a stem occurs, as a list of (record, stem number) pairs, whatever its spelling.
+    # The stems are normalized the way the index was saved with, unless fold_diphthongs asks for a setting, which
+    # the index then has to have been saved with.
+
+    def __init__(self, path = NORMALIZED_INDEX_PATH, json_path = jsonisator.DICTLINE_JSON_PATH, fold_diphthongs = None):
+        super().__init__(path, json_path)
+        self.fold_diphthongs = bool(self.flags & FOLD_DIPHTHONGS_FLAG)
+
+        if fold_diphthongs is not None and fold_diphthongs != self.fold_diphthongs:
+            raise ValueError("The index was saved " + ("with" if self.fold_diphthongs else "without") + " the diphthongs folded.")
+
+    def lookup(self, stem):
+        return self.get(normalize(stem, self.fold_diphthongs))
+
+    def stems(self):
+        return [self.key(index).decode("utf-8") for index in range(self.count)]
+
+
+#################################
+#      Fuzzy stem lookup        #
+#################################
+
+# Largest edit distance the fuzzy lookup is prepared for
+MAX_EDIT_DISTANCE = 2
+
+
+def _deletes(word, distance):
+    # Every string made by deleting at most distance letters from the word (the word itself included)
+    found = {word}
+    current = {word}
+
+    for _ in range(distance):
+        current = {variant[:position] + variant[position + 1:] for variant in current for position in range(len(variant))}
+        found |= current
+
+    return found
+
+
+def edit_distance(first, second, limit):
+    # Optimal string alignment distance (Levenshtein with transpositions), or limit + 1 if it is greater than limit
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+
+    previous_row = None
+    row = list(range(len(second) + 1))
+
+    for i in range(1, len(first) + 1):
+        next_row = [i] + [0] * len(second)
+
+        for j in range(1, len(second) + 1):
+            cost = first[i - 1] != second[j - 1]
+            next_row[j] = min(row[j] + 1, next_row[j - 1] + 1, row[j - 1] + cost)
+
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                next_row[j] = min(next_row[j], previous_row[j - 2] + 1)
+
+        if min(next_row) > limit:
+            return limit + 1
+
+        previous_row, row = row, next_row
+
+    return row[-1] if row[-1] <= limit else limit + 1
+
+
+class FuzzyStems:
+    # Finds the stems within a small edit distance of a word, using symmetric deletes: every stem is filed under each
+    # string made by deleting up to MAX_EDIT_DISTANCE of its letters. Any stem within that distance of a word then
+    # shares one of those strings with the word, so only the few stems filed under the word's own deletes have their
+    # distance checked, instead of every stem.
+
+    def __init__(self, stems, max_distance = MAX_EDIT_DISTANCE):
+        self.max_distance = max_distance
+        self.deletes = {}
+
+        for stem in set(stems):
+            for variant in _deletes(stem, max_distance):
+                self.deletes.setdefault(variant, []).append(stem)
+
+    @classmethod
+    def from_index(cls, index, max_distance = MAX_EDIT_DISTANCE):
+        # Files the stems of a NormalizedStemIndex, so words are to be normalized before they are looked up
+        return cls(index.stems(), max_distance)
+
+    def lookup(self, word, distance = 1):
+        # Returns (stem, distance) of every stem within the distance of the word, closest first
+        if distance > self.max_distance:
+            raise ValueError("Distance greater than the one the stems were filed for (" + str(self.max_distance) + ").")
+
+        candidates = set()
+
+        for variant in _deletes(word, distance):
+            candidates.update(self.deletes.get(variant, ()))
+
+        found = []
+
+        for stem in candidates:
+            stem_distance = edit_distance(word, stem, distance)
+
+            if stem_distance <= distance:
+                found.append((stem, stem_distance))
+
+        found.sort(key = lambda item: (item[1], item[0]))
+
+        return found
+
+
+#################################
+#         Senses index          #
+#################################
+
+SENSES_INDEX_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "DICTLINE.senses.idx"
+
+# Postings of the senses index: number of the record, how many times the term occurs in its senses and its frequency
+# code (as the byte of its letter), so results can be ranked without looking into the dictionary
+SENSES_POSTING = "<IHB"
+
+# Weight of the frequency codes of the entries when ranking results: from A (very frequent) to F (very rare),
+# while those only found in inscriptions (I), graffiti (M), Pliny (N) or of unknown frequency (X) come last
+FREQUENCY_WEIGHTS = {"A": 6, "B": 5, "C": 4, "D": 3, "E": 2, "F": 1}
+DEFAULT_FREQUENCY_WEIGHT = 1
+
+# The senses are split into meanings on these, and the meanings into words
+SENSE_SEPARATORS = re.compile(r"[;,()]")
+SENSE_WORD = re.compile(r"[^\W_]+")
+
+
+def sense_terms(senses):
+    # Returns each term of the senses (lower-case words of its meanings) along with the number of times it occurs
+    terms = {}
+
+    for meaning in SENSE_SEPARATORS.split(senses.lower()):
+        for word in SENSE_WORD.findall(meaning):
+            terms[word] = terms.get(word, 0) + 1
+
+    return terms
+
+
+class SensesIndexWriter:
+    # Builds the inverted index of the English terms of the senses
+
+    def __init__(self, path = SENSES_INDEX_PATH, json_path = jsonisator.DICTLINE_JSON_PATH):
+        self.writer = KeyIndexWriter(path, SENSES_POSTING, json_path)
+        self.record = 0
+
+    def add(self, entry):
+        frequency = ord(entry["frequency"][:1] or "X")
+
+        for term, count in sense_terms(entry["senses"]).items():
+            self.writer.add(term, (self.record, min(count, 0xFFFF), frequency))
+
+        self.record += 1
+
+    def close(self):
+        self.writer.close()
+
+
+class SensesIndex(KeyIndex):
+    # Finds the records whose senses contain English terms. The records are the positions of the entries within
+    # DICTLINE.json, so they can be read with random_access.open_dictline() or binary_format.BinaryDictionary
+    # without loading the dictionary.
+
+    def __init__(self, path = SENSES_INDEX_PATH, json_path = jsonisator.DICTLINE_JSON_PATH):
+        super().__init__(path, json_path)
+
+    def lookup(self, term):
+        # Returns (record, term frequency, frequency code) of every record having the term
+        return [(record, count, chr(frequency)) for record, count, frequency in self.get(term.lower())]
+
+    def _scores(self, term, scores, prefix):
+        postings = [term_postings for _, term_postings in self.prefix(term)] if prefix else [self.get(term)]
+
+        for term_postings in postings:
+            for record, count, frequency in term_postings:
+                scores[record] = scores.get(record, 0) + count * FREQUENCY_WEIGHTS.get(chr(frequency), DEFAULT_FREQUENCY_WEIGHT)
+
+    def search(self, query, k = 10):
+        # Returns (record, score) of the k best records for the query, best first. Each term of the query adds the
+        # number of times it occurs in a record times the weight of its frequency to the score of the record. Terms
+        # ending with * match every term starting with them.
+        scores = {}
+
+        for term in query.lower().split():
+            # Split into words the same way as the senses, of which only the last is a prefix (a bare * has no words,
+            # rather than matching every term)
+            words = SENSE_WORD.findall(term)
+
+            for position, word in enumerate(words, 1):
+                self._scores(word, scores, position == len(words) and term.endswith("*"))
+
+        return heapq.nlargest(k, scores.items(), key = lambda item: (item[1], -item[0]))
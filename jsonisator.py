@@ -1,6 +1,9 @@
+import argparse
+import cProfile
 import json
-import re
+import os
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -10,8 +13,8 @@ from datetime import datetime
 # requires nothing more than just sending the appropriate JSON entry.
 
 # The script shall open the DICTLINE.txt/INFLECTIONS.txt file as provided by the DICTLINE_PATH/INFLECTS_PATH filepath.
-# It shall then do some preparatory formatting before running through the entire file
-# line by line. Each line shall be analysed and its content shall be put in a Python dictionary object.
+# It shall then run through the entire file line by line. Each line shall be analysed and its
+# content shall be put in a Python dictionary object.
 # Any lines that can not be analysed (although very unlikely) shall be noted and displayed appropriately.
 # Once all lines have been analysed, each dictionary object shall be turned into JSON and
 # saved to a file as provided by the DICTLINE_JSON_PATH/INFLECTS_JSON_PATH filepath.
@@ -22,9 +25,11 @@ from datetime import datetime
 # Getting things done was the first priority while writing this. Also, I'm not very well versed
 # in Python. Please take that in account before calling thousands of curses upon me.
 
-# Set up the output directory in case it doesn't exist
+# Importing this module has no side effects: the parsing is exposed through the iter_dictline/iter_inflects
+# generators, which read their source file line by line and yield one entry at a time. The conversion
+# itself (writing the JSON files, the report and the prompts) only happens when the script is run.
+
 OUTPUT_DIRECTORY_PATH = Path(__file__).parent / "output/"
-Path(OUTPUT_DIRECTORY_PATH).mkdir(exist_ok = True)
 
 DICTLINE_PATH = Path(__file__).parent / "sources/DICTLINE.TXT"
 DICTLINE_JSON_PATH = Path(__file__).parent / "output/DICTLINE.json"
@@ -38,9 +43,72 @@ REPORT_PATH = Path(__file__).parent / str("output/REPORT-" + datetime.now().strf
 NO_STEM = "NO_STEM"
 NO_ENDING = "NO_ENDING"
 
+# Encoding of the DICTLINE/INFLECTS files
+SOURCE_ENCODING = "utf-8"
+
 # Remove all unnecessary whitespace from the JSON file (reduces storage usage)
 COMPACT_JSON = True
 
+# Save the entries as NDJSON (one JSON entry per line, in a .ndjson file) instead of a JSON array.
+# Can also be turned on with --ndjson.
+NDJSON = False
+
+# Also save the dictionary in the compact binary format of binary_format.py. Can also be turned on with --binary.
+BINARY = False
+
+# Also save an index of the stems (see indexes.py) next to DICTLINE.json. Can also be turned on with --stem-index.
+STEM_INDEX = False
+
+# Also save an index of the stems with their spelling normalized (i for j, u for v, see indexes.py) next to
+# DICTLINE.json. Can also be turned on with --normalized-index.
+NORMALIZED_INDEX = False
+
+# Also save an inverted index of the English terms of the senses (see indexes.py) next to DICTLINE.json. Can also be
+# turned on with --senses-index.
+SENSES_INDEX = False
+
+# Also save an index of the endings (see indexes.py) next to INFLECTS.json. Can also be turned on with --ending-index.
+ENDING_INDEX = False
+
+# Also save the offset of every entry within the JSON files (see random_access.py), so single entries can be read
+# without loading the rest. Can also be turned on with --offsets.
+OFFSET_INDEX = False
+
+# Also export the dictionary and the inflections to an SQLite database (see sqlite_export.py). Can also be turned on
+# with --sqlite.
+SQLITE = False
+
+# Also save the delta from the previous DICTLINE.json to the new one (see delta.py). Can also be turned on with --delta.
+DELTA = False
+
+# Also save the entries split into shards by POS (see shards.py), to output/shards/. Can also be turned on with
+# --shards. With SHARD_PREFIX (or --shard-prefix) set to 1 or 2, the shards of DICTLINE are also split by the first
+# one or two letters of the first stem of their entries.
+SHARDS = False
+SHARD_PREFIX = 0
+
+# Also save the JSON files (and their shards) compressed with gzip and lzma (see compression.py), next to them. Can
+# also be turned on with --compress. COMPRESSION_LEVEL (or --compression-level) goes from 1 (quickest) to 9 (smallest).
+COMPRESS = False
+COMPRESSION_LEVEL = 6
+
+# Only make the JSON files again if their sources changed, and then only parse the parts of the sources which
+# changed (see incremental.py). Can also be turned on with --incremental.
+INCREMENTAL = False
+
+# Time each phase of the conversion (and the parsing of each POS), adding the times to the report and saving them
+# to a JSON metrics file (see metrics.py). Can also be turned on with --metrics. --trace-memory also traces the peak
+# memory, and --profile FILE saves a cProfile dump of the run to the file.
+METRICS = False
+
+# Version of the converter, recorded in the manifest of incremental.py. Bump it whenever the output changes.
+CONVERTER_VERSION = 1
+
+# Number of processes parsing DICTLINE (can also be set with --workers). With more than one worker, the file is
+# split into WORKER_CHUNKS chunks per worker, so a worker which is done early can pick up another chunk.
+WORKERS = 1
+WORKER_CHUNKS = 4
+
 # If set to True, the script will run through the files without any prompts
 #
 # Set SAVE_REPORT to True to get a report of the run saved in a file in the output dictionary
@@ -49,719 +117,815 @@ COMPACT_JSON = True
 HEADLESS = False
 SAVE_REPORT = False
 
-with open(DICTLINE_PATH, "r") as dictline_file:
-    dictline_data = dictline_file.readlines()
+# Parts of speech in the order (and under the name) in which they are listed in the report
+DICTLINE_REPORT_LABELS = (
+    ("N", "NOUNS"),
+    ("PRON", "PRONOUNS"),
+    ("V", "VERBS"),
+    ("ADJ", "ADJECTIVES"),
+    ("ADV", "ADVERBS"),
+    ("PREP", "PREPOSITIONS"),
+    ("INTERJ", "INTERJECTIONS"),
+    ("NUM", "NUMBERS"),
+    ("CONJ", "CONJUNCTIONS"),
+    ("PACK", "PACKONS")
+)
+
+INFLECTS_REPORT_LABELS = (
+    ("N", "NOUNS"),
+    ("ADJ", "ADJECTIVES"),
+    ("ADV", "ADVERBS"),
+    ("PREP", "PREPOSITIONS"),
+    ("INTERJ", "INTERJECTIONS"),
+    ("PRON", "PRONOUNS"),
+    ("V", "VERBS"),
+    ("VPAR", "VERB PARTICIPLES"),
+    ("SUPINE", "SUPINES"),
+    ("NUM", "NUMBERS"),
+    ("CONJ", "CONJUNCTIONS")
+)
+
+
+class ParseReport:
+    # Collects the number of parsed entries per part of speech and the lines which could not be parsed.
+    # Pass one to iter_dictline/iter_inflects if you are interested in those.
+
+    def __init__(self):
+        self.counts = {}
+        self.errors = []
+
+    def count(self, pos):
+        self.counts[pos] = self.counts.get(pos, 0) + 1
+
+    def total(self):
+        return sum(self.counts.values())
+
+    def merge(self, other):
+        # Adds the counts and errors of a report made for a later part of the same file
+        for pos, count in other.counts.items():
+            self.counts[pos] = self.counts.get(pos, 0) + count
+        self.errors.extend(other.errors)
+
+
+#################################
+#         Entry schemas         #
+#################################
+
+# Layout of every kind of dictionary entry, keyed by its POS (part of speech):
+# - the number of stems the entry has (stems missing from the line are filled with NO_STEM)
+# - the numbers of stems a line can actually give
+# - the fields which follow the POS, with the function converting each of them
+#
+# All entries then end with DICTLINE_COMMON_FIELDS and the senses (definition string).
+DICTLINE_SCHEMA = {
+    # Nouns with one stem are usually abbreviations and letters etc.
+    "N": (2, (1, 2), (("declension", int), ("declension_variant", int), ("gender", str), ("noun_kind", str))),
+    "PRON": (2, (2,), (("declension", int), ("declension_variant", int), ("pronoun_kind", str))),
+    # Verbs with one stem are a few Biblical/Aramaic verbs
+    "V": (4, (1, 4), (("conjugation", int), ("conjugation_variant", int), ("verb_kind", str))),
+    "ADJ": (4, (1, 2, 4), (("declension", int), ("declension_variant", int), ("comparison", str))),
+    "ADV": (3, (1, 3), (("comparison", str),)),
+    "PREP": (1, (1,), (("case", str),)),
+    "INTERJ": (1, (1,), ()),
+    # numeral_value contains value of the number (e.g 19 for undevicensum) or 0 (e.g number is an adverbial)
+    "NUM": (4, (1, 4), (("declension", int), ("declension_variant", int), ("numeral_sort", str), ("numeral_value", int))),
+    "CONJ": (1, (1,), ()),
+    # packon_kind is actually the same as pronoun_kind
+    "PACK": (2, (2,), (("declension", int), ("declension_variant", int), ("packon_kind", str)))
+}
+
+DICTLINE_COMMON_FIELDS = ("age", "area", "geography", "frequency", "source")
+
+
+# Some endings are merely empty strings. In the original INFLECTS file, they were
+# simply not there. For the sake of everybody's sanity, I have decided to denote
+# such endings with NULL in the INFLECTS file (as Whitaker himself did a couple of times) 
+# and NO_ENDING in the JSON variant.
+def _ending(value):
+    return NO_ENDING if value == "NULL" else value
+
+
+# Fields of every kind of inflection which follow the POS, keyed by the POS.
+# All inflections then end with INFLECTS_COMMON_FIELDS.
+INFLECTS_SCHEMA = {
+    # Adverbs, prepositions, conjunctions and interjections have only a few possible "endings".
+    # They all evaluate to NO_ENDING and are unique in that they have little information about them.
+    "ADV": (("comparison", str),),
+    "PREP": (("case", str),),
+    "CONJ": (),
+    "INTERJ": (),
+    "N": (("declension", int), ("declension_variant", int), ("case", str), ("number", str), ("gender", str)),
+    "ADJ": (("declension", int), ("declension_variant", int), ("case", str), ("number", str), ("gender", str), ("comparison", str)),
+    "V": (("conjugation", int), ("conjugation_variant", int), ("tense", str), ("voice", str), ("mood", str), ("person", str), ("number", str)),
+    "VPAR": (("conjugation", int), ("conjugation_variant", int), ("case", str), ("number", str), ("gender", str), ("tense", str), ("voice", str), ("mood", str)),
+    "SUPINE": (("conjugation", int), ("conjugation_variant", int), ("case", str), ("number", str), ("gender", str)),
+    "PRON": (("declension", int), ("declension_variant", int), ("case", str), ("number", str), ("gender", str)),
+    "NUM": (("declension", int), ("declension_variant", int), ("case", str), ("number", str), ("gender", str), ("numeral_sort", str))
+}
+
+INFLECTS_COMMON_FIELDS = (("stem", int), ("characters", int), ("ending", _ending), ("age", str), ("frequency", str))
+
+
+# The functions below compile the schemas into plain Python functions, in the way collections.namedtuple
+# builds its classes. The resulting code is the same as what one would write by hand for a single kind of
+# entry (see _compile_extractor), so the schemas cost nothing once they are compiled.
+
+def _compile(name, source, namespace = None):
+    namespace = dict(namespace or {}, NO_STEM = NO_STEM, int = int, _ending = _ending)
+    exec(source, namespace)
+    return namespace[name]
+
+
+def _compile_extractor(name, arguments, items):
+    # Compiles the function which turns the parts of a line into an entry. Each item is a pair of a field name
+    # and the Python expression giving its value from the arguments.
+    #
+    # The entry is built by a single dict literal, so once a line has been classified nothing else is
+    # looked up or checked.
+    source = "def " + name + "(" + arguments + "):\n"
+    source += "    return {\n"
+    for field, expression in items:
+        source += "        " + repr(field) + ": " + expression + ",\n"
+    source += "    }\n"
+
+    return _compile(name, source)
+
+
+def _converted(convert, expression):
+    if convert is str:
+        return expression
+    return convert.__name__ + "(" + expression + ")"
+
+
+def _compile_dictline_schema(schema):
+    # Compiles the schema into a map of POS -> (number of stems, number of fields, extractor).
+    #
+    # An extractor takes the stems (already filled up to the number of stems), the POS, the list of fields
+    # which follow the POS up to (and including) the source, and the senses.
+    dispatch = {}
+
+    for pos, (stem_count, _, fields) in schema.items():
+        fields = fields + tuple((name, str) for name in DICTLINE_COMMON_FIELDS)
+        items = [("stems", "stems"), ("pos", "pos")]
+
+        for index, (name, convert) in enumerate(fields):
+            items.append((name, _converted(convert, "fields[" + str(index) + "]")))
+
+        items.append(("senses", "senses"))
+
+        extract = _compile_extractor("extract_" + pos.lower(), "stems, pos, fields, senses", items)
+        dispatch[pos] = (stem_count, len(fields), extract)
+
+    return dispatch
+
 
-    # Removes unnecessary whitespace, leaving exactly one space between each part of the entry.
-    dictline_formatted = [re.sub("\s\s+", " ", s) for s in dictline_data]
+def _compile_inflects_schema(schema):
+    # Compiles the schema into a map of POS -> extractor. An extractor takes the whole split line.
+    dispatch = {}
 
-    # Replaces all "zzz" with NO_STEM, making its meaning clearer
-    dictline_formatted = [re.sub("zzz", NO_STEM, s) for s in dictline_formatted]
+    for pos, fields in schema.items():
+        fields = (("pos", str),) + fields + INFLECTS_COMMON_FIELDS
+        items = [(name, _converted(convert, "sline[" + str(index) + "]")) for index, (name, convert) in enumerate(fields)]
+        dispatch[pos] = _compile_extractor("extract_" + pos.lower(), "sline", items)
 
-    lines = []
-    
-    for entry in dictline_formatted:
-        lines.append(entry)
+    return dispatch
 
-    ERROR_LINES = []
-    ERROR_COUNT = 0
 
-    NOUN_COUNT = 0
-    PRONOUN_COUNT = 0
-    VERB_COUNT = 0
-    ADJECTIVE_COUNT = 0
-    ADVERB_COUNT = 0
-    PREPOSITION_COUNT = 0
-    INTERJECTION_COUNT = 0
-    NUMBER_COUNT = 0
-    CONJUNCTION_COUNT = 0
-    PACKON_COUNT = 0
+# The POS comes right after the stems, so it can be found at most this far into a line
+MAX_STEMS = max(stem_count for stem_count, _, _ in DICTLINE_SCHEMA.values())
 
-    json_lines = []
+# DICTLINE is a fixed-column file. Each stem takes STEM_WIDTH columns (the stem itself and the spaces padding it)
+# and the POS starts right at the column after the last stem. Stems an entry doesn't have are either left
+# blank or written as "zzz".
+STEM_WIDTH = 19
+STEM_COLUMNS = tuple(given * STEM_WIDTH for given in range(1, MAX_STEMS + 1))
 
+DICTLINE_DISPATCH = _compile_dictline_schema(DICTLINE_SCHEMA)
+
+# Number of stems a line can give for each POS, used when a line has to be split by its tokens
+DICTLINE_GIVEN_STEMS = {(pos, given) for pos, (_, given_counts, _) in DICTLINE_SCHEMA.items() for given in given_counts}
+INFLECTS_DISPATCH = _compile_inflects_schema(INFLECTS_SCHEMA)
+
+
+#################################
+#    Dictionary jsonisation     #
+#################################
+
+def parse_dictline(line):
+    # Returns the dictionary entry for a single DICTLINE line or None if the line can not be parsed.
+    #
+    # The line is sliced by its columns, so no more than a single pass is made over it (see _split_columns).
+    # Lines which don't follow the column layout are split by their tokens instead.
+    parts = _split_columns(line) or _split_tokens(line)
+
+    if parts is None:
+        return None
+
+    pos, stems, rest = parts
+    stem_count, field_count, extract = DICTLINE_DISPATCH[pos]
+
+    # Fill the stems the line doesn't give with NO_STEM. Any stems beyond those the POS has must be empty.
+    if len(stems) < stem_count:
+        stems += [NO_STEM] * (stem_count - len(stems))
+    elif len(stems) > stem_count:
+        if any(stem != NO_STEM for stem in stems[stem_count:]):
+            return None
+        del stems[stem_count:]
+
+    # The last part is whatever follows the source, i.e. the senses
+    fields = rest.split(None, field_count)
+
+    if len(fields) < field_count:
+        return None
+
+    # The senses are returned to normal, leaving exactly one space between each word
+    senses = " ".join(fields[field_count].split()) if len(fields) > field_count else ""
+
+    try:
+        return extract(tuple(stems), pos, fields, senses)
+    except ValueError:
+        # Non-numeric value where a number is expected
+        return None
+
+
+def _split_columns(line):
+    # Splits a line into its POS, stems and the rest of the line following the POS by slicing its columns.
+    # Returns None if the line doesn't follow the column layout.
+    for column in STEM_COLUMNS:
+        if line[column - 1:column] == " ":
+            end = line.find(" ", column)
+            if end < 0:
+                end = len(line)
+            if line[column:end] in DICTLINE_DISPATCH:
+                break
+    else:
+        return None
+
+    stems = line[:column].split()
+    slots = column // STEM_WIDTH
+
+    if len(stems) < slots:
+        # Some stems are left blank, so each column has to be looked at on its own
+        stems = [line[start:start + STEM_WIDTH].strip() or NO_STEM for start in range(0, column, STEM_WIDTH)]
+
+        if any(" " in stem for stem in stems):
+            return None
+    elif len(stems) > slots:
+        # More words than there are stem columns, the line is not laid out in columns after all
+        return None
+
+    # Replaces "zzz" with NO_STEM, making its meaning clearer
+    if "zzz" in stems:
+        stems = [NO_STEM if stem == "zzz" else stem for stem in stems]
+
+    return line[column:end], stems, line[end:]
+
+
+def _split_tokens(line):
+    # Splits a line into its POS, stems and the rest of the line following the POS by its tokens.
+    # The POS always comes right after the stems, so its position is the number of stems the line gives.
+    sline = line.split()
+
+    for given in range(1, min(MAX_STEMS, len(sline) - 1) + 1):
+        if (sline[given], given) in DICTLINE_GIVEN_STEMS:
+            stems = [NO_STEM if stem == "zzz" else stem for stem in sline[:given]]
+            return sline[given], stems, " ".join(sline[given + 1:])
+
+    return None
+
+
+def iter_dictline(path = DICTLINE_PATH, report = None):
+    # Yields the dictionary entries of the DICTLINE file one at a time, in file order.
+    with open(path, "r", encoding = SOURCE_ENCODING) as dictline_file:
+        yield from _parse_dictline_lines(dictline_file, report)
+
+
+def _parse_dictline_lines(lines, report):
     for line in lines:
-        sline = line.split()
-
-        # Check if the split line is a specific type of word and handle appropriately.
-        #
-        # Always check based on POS (part of speech) which comes after all the stems.
-        #
-        # Specifics:
-        # - Nouns:
-        #    - one stem
-        #    - two stems
-        # - Pronoun:
-        #    - two stems
-        # - Verbs:
-        #    - one stem
-        #    - four stems
-        # - Adjectives:
-        #    - one stem
-        #    - two stems
-        #    - four stems
-        # - Adverbs:
-        #    - one stem
-        #    - three stems
-        # - Preposition
-        #    - one stem
-        # - Interjection:
-        #    - one stem
-        # - Numbers:
-        #    - one stem
-        #    - four stems
-        # - Conjunction:
-        #    - one stem
-        # - Packon:
-        #    - two stems
-
-        if sline[1] == 'N':
-            # Entry is a noun with one stem (usually abbreviations and letters etc.)
-            json_noun_one = {
-                "stems": (sline[0], NO_STEM),
-                "pos": sline[1],
-                "declension": int(sline[2]),
-                "declension_variant": int(sline[3]),
-                "gender": sline[4],
-                "noun_kind": sline[5],
-                "age": sline[6],
-                "area": sline[7],
-                "geography": sline[8],
-                "frequency": sline[9],
-                "source": sline[10],
-                "senses": " ".join(sline[11:]) # Definition string was split at first, but now needs to be returned to normal
-            }
-            json_lines.append(json_noun_one)
-            NOUN_COUNT += 1
-            continue
-        
-        if sline[2] == 'N':
-            # Entry is a noun with two stems
-            json_noun_two = {
-                "stems": (sline[0], sline[1]),
-                "pos": sline[2],
-                "declension": int(sline[3]),
-                "declension_variant": int(sline[4]),
-                "gender": sline[5],
-                "noun_kind": sline[6],
-                "age": sline[7],
-                "area": sline[8],
-                "geography": sline[9],
-                "frequency": sline[10],
-                "source": sline[11],
-                "senses": " ".join(sline[12:])
-            }
-            json_lines.append(json_noun_two)
-            NOUN_COUNT += 1
+        if not line.strip():
             continue
 
-        if sline[2] == 'PRON':
-            # Entry is a pronoun
-            json_pronoun = {
-                "stems": (sline[0], sline[1]),
-                "pos": sline[2],
-                "declension": int(sline[3]),
-                "declension_variant": int(sline[4]),
-                "pronoun_kind": sline[5],
-                "age": sline[6],
-                "area": sline[7],
-                "geography": sline[8],
-                "frequency": sline[9],
-                "source": sline[10],
-                "senses": " ".join(sline[11:])
-            }
-            json_lines.append(json_pronoun)
-            PRONOUN_COUNT += 1
-            continue
+        entry = parse_dictline(line)
 
-        if sline[1] == 'V':
-            # Entry is a verb with one stem (a few Biblical/Aramaic verbs)
-            json_verb_one = {
-                "stems": (sline[0], NO_STEM, NO_STEM, NO_STEM),
-                "pos": sline[1],
-                "conjugation": int(sline[2]),
-                "conjugation_variant": int(sline[3]),
-                "verb_kind": sline[4],
-                "age": sline[5],
-                "area": sline[6],
-                "geography": sline[7],
-                "frequency": sline[8],
-                "source": sline[9],
-                "senses": " ".join(sline[10:])
-            }
-            json_lines.append(json_verb_one)
-            VERB_COUNT += 1
+        if entry is None:
+            # Used for debugging purposes in the event the script misses something.
+            if report is not None:
+                report.errors.append("Could not parse line (" + " ".join(line.split()) + ").")
             continue
 
-        if sline[4] == 'V':
-            # Entry is a verb with four stems
-            json_verb_four = {
-                "stems": (sline[0], sline[1], sline[2], sline[3]),
-                "pos": sline[4],
-                "conjugation": int(sline[5]),
-                "conjugation_variant": int(sline[6]),
-                "verb_kind": sline[7],
-                "age": sline[8],
-                "area": sline[9],
-                "geography": sline[10],
-                "frequency": sline[11],
-                "source": sline[12],
-                "senses": " ".join(sline[13:])
-            }
-            json_lines.append(json_verb_four)
-            VERB_COUNT += 1
-            continue
+        if report is not None:
+            report.count(entry["pos"])
 
-        if sline[1] == 'ADJ':
-            # Entry is an adjective with one stem
-            json_adjective_one = {
-                "stems": (sline[0], NO_STEM, NO_STEM, NO_STEM),
-                "pos": sline[1],
-                "declension": int(sline[2]),
-                "declension_variant": int(sline[3]),
-                "comparison": sline[4],
-                "age": sline[5],
-                "area": sline[6],
-                "geography": sline[7],
-                "frequency": sline[8],
-                "source": sline[9],
-                "senses": " ".join(sline[10:])
-            }
-            json_lines.append(json_adjective_one)
-            ADJECTIVE_COUNT += 1
-            continue
+        yield entry
 
-        if sline[2] == 'ADJ':
-            # Entry is an adjective with two stems
-            json_adjective_two = {
-                "stems": (sline[0], sline[1], NO_STEM, NO_STEM),
-                "pos": sline[2],
-                "declension": int(sline[3]),
-                "declension_variant": int(sline[4]),
-                "comparison": sline[5],
-                "age": sline[6],
-                "area": sline[7],
-                "geography": sline[8],
-                "frequency": sline[9],
-                "source": sline[10],
-                "senses": " ".join(sline[11:])
-            }
-            json_lines.append(json_adjective_two)
-            ADJECTIVE_COUNT += 1
-            continue
 
-        if sline[4] == 'ADJ':
-            # Entry is an adjective with four stems
-            json_adjective_four = {
-                "stems": (sline[0], sline[1], sline[2], sline[3]),
-                "pos": sline[4],
-                "declension": int(sline[5]),
-                "declension_variant": int(sline[6]),
-                "comparison": sline[7],
-                "age": sline[8],
-                "area": sline[9],
-                "geography": sline[10],
-                "frequency": sline[11],
-                "source": sline[12],
-                "senses": " ".join(sline[13:])
-            }
-            json_lines.append(json_adjective_four)
-            ADJECTIVE_COUNT += 1
-            continue
+def iter_dictline_parallel(path = DICTLINE_PATH, report = None, workers = WORKERS):
+    # Same as iter_dictline, but the file is parsed by several processes at once.
+    #
+    # The file is split into byte ranges ending on line boundaries, each of which is parsed on its own.
+    # The chunks are put back together in file order (along with their reports), so the entries and the
+    # report are exactly the same as those of iter_dictline.
+    ranges = _split_ranges(path, workers * WORKER_CHUNKS)
 
-        if sline[1] == 'ADV':
-            # Entry is an adverb with one stem
-            json_adverb_one = {
-                "stems": (sline[0], NO_STEM, NO_STEM),
-                "pos": sline[1],
-                "comparison": sline[2],
-                "age": sline[3],
-                "area": sline[4],
-                "geography": sline[5],
-                "frequency": sline[6],
-                "source": sline[7],
-                "senses": " ".join(sline[8:])
-            }
-            json_lines.append(json_adverb_one)
-            ADVERB_COUNT += 1
-            continue
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        chunks = [executor.submit(_parse_dictline_range, path, start, end) for start, end in ranges]
 
-        if sline[3] == 'ADV':
-            # Entry is an adverb with three stems
-            json_adverb_three = {
-                "stems": (sline[0], sline[1], sline[2]),
-                "pos": sline[3],
-                "comparison": sline[4],
-                "age": sline[5],
-                "area": sline[6],
-                "geography": sline[7],
-                "frequency": sline[8],
-                "source": sline[9],
-                "senses": " ".join(sline[10:])
-            }
-            json_lines.append(json_adverb_three)
-            ADVERB_COUNT += 1
-            continue
+        for chunk in chunks:
+            entries, chunk_report = chunk.result()
 
-        if sline[1] == 'PREP':
-            # Entry is a preposition
-            json_preposition = {
-                # added extra comma to declare a singletone tuple, lest it be parsed as a string
-                "stems": (sline[0],),
-                "pos": sline[1],
-                "case": sline[2],
-                "age": sline[3],
-                "area": sline[4],
-                "geography": sline[5],
-                "frequency": sline[6],
-                "source": sline[7],
-                "senses": " ".join(sline[8:])
-            }
-            json_lines.append(json_preposition)
-            PREPOSITION_COUNT += 1
-            continue
+            if report is not None:
+                report.merge(chunk_report)
 
-        if sline[1] == 'INTERJ':
-            # Entry is an interjection
-            json_interjection = {
-                "stems": (sline[0],),
-                "pos": sline[1],
-                "age": sline[2],
-                "area": sline[3],
-                "geography": sline[4],
-                "frequency": sline[5],
-                "source": sline[6],
-                "senses": " ".join(sline[7:])
-            }
-            json_lines.append(json_interjection)
-            INTERJECTION_COUNT += 1
-            continue
+            yield from entries
 
-        if sline[4] == 'NUM':
-            # Entry is a number with four stems 
-            json_number_four = {
-                "stems": (sline[0], sline[1], sline[2], sline[3]),
-                "pos": sline[4],
-                "declension": int(sline[5]),
-                "declension_variant": int(sline[6]),
-                "numeral_sort": sline[7],
-                "numeral_value": int(sline[8]), # Contains value of the number (e.g 19 for undevicensum) or 0 (e.g number is an adverbial)
-                "age": sline[9],
-                "area": sline[10],
-                "geography": sline[11],
-                "frequency": sline[12],
-                "source": sline[13],
-                "senses": " ".join(sline[14:])
-            }
-            json_lines.append(json_number_four)
-            NUMBER_COUNT += 1
-            continue
 
-        if sline[1] == 'NUM':
-            # Entry is a number with one stem
-            json_number_one = {
-                "stems": (sline[0], NO_STEM, NO_STEM, NO_STEM),
-                "pos": sline[1],
-                "declension": int(sline[2]),
-                "declension_variant": int(sline[3]),
-                "numeral_sort": sline[4],
-                "numeral_value": int(sline[5]),
-                "age": sline[6],
-                "area": sline[7],
-                "geography": sline[8],
-                "frequency": sline[9],
-                "source": sline[10],
-                "senses": " ".join(sline[11:])
-            }
-            json_lines.append(json_number_one)
-            NUMBER_COUNT += 1
-            continue
+def _split_ranges(path, count):
+    # Splits the file into (at most) count byte ranges of about the same size, each starting at the beginning of a line
+    size = os.path.getsize(path)
+    boundaries = [0]
 
-        if sline[1] == 'CONJ':
-            # Entry is a conjunction
-            json_conjunction = {
-                "stems": (sline[0],),
-                "pos": sline[1],
-                "age": sline[2],
-                "area": sline[3],
-                "geography": sline[4],
-                "frequency": sline[5],
-                "source": sline[6],
-                "senses": " ".join(sline[7:])
-            }
-            json_lines.append(json_conjunction)
-            CONJUNCTION_COUNT += 1
-            continue
+    with open(path, "rb") as source_file:
+        for index in range(1, count):
+            source_file.seek(max(size * index // count, boundaries[-1]))
+            source_file.readline()
 
-        if sline[2] == 'PACK':
-            # Entry is a PACKON
-            json_packon = {
-                "stems": (sline[0], sline[1]),
-                "pos": sline[2],
-                "declension": int(sline[3]),
-                "declension_variant": int(sline[4]),
-                "packon_kind": sline[5], # Actually the same as pronoun_kind
-                "age": sline[6],
-                "area": sline[7],
-                "geography": sline[8],
-                "frequency": sline[9],
-                "source": sline[10],
-                "senses": " ".join(sline[11:])
-            }
-            json_lines.append(json_packon)
-            PACKON_COUNT += 1
-            continue
+            if source_file.tell() >= size:
+                break
+            boundaries.append(source_file.tell())
+
+    boundaries.append(size)
+
+    return list(zip(boundaries, boundaries[1:]))
 
-        # Used for debugging purposes in the event the script misses something.
-        NOT_CONFORM = "Could not parse line (" + line + ")."
-        ERROR_LINES.append(NOT_CONFORM)
-        ERROR_COUNT += 1
-    
-    # We have finished storing the lines and can now begin converting to JSON.
-    with open(DICTLINE_JSON_PATH, "w") as json_file:
-        
-        if COMPACT_JSON:
-            json_file.write(json.dumps(json_lines, separators = (',', ':')))
-        else:
-            json_file.write(json.dumps(json_lines, indent = 4))
-        
-
-        TOTAL = (NOUN_COUNT 
-                + PRONOUN_COUNT 
-                + VERB_COUNT 
-                + ADJECTIVE_COUNT 
-                + ADVERB_COUNT 
-                + PREPOSITION_COUNT 
-                + INTERJECTION_COUNT 
-                + NUMBER_COUNT 
-                + CONJUNCTION_COUNT 
-                + PACKON_COUNT)
-        
-        result_dictionary = "Finished parsing and saved the JSON dictionary document with (" + str(ERROR_COUNT) + ") errors.\n"
-        result_dictionary += "Successfully parsed:\n"
-
-        result_dictionary += ""
-        result_dictionary += str(NOUN_COUNT) + " NOUNS\n"
-        result_dictionary += str(PRONOUN_COUNT) + " PRONOUNS\n"
-        result_dictionary += str(VERB_COUNT) + " VERBS\n"
-        result_dictionary += str(ADJECTIVE_COUNT) + " ADJECTIVES\n"
-        result_dictionary += str(ADVERB_COUNT) + " ADVERBS\n"
-        result_dictionary += str(PREPOSITION_COUNT) + " PREPOSITIONS\n"
-        result_dictionary += str(INTERJECTION_COUNT) + " INTERJECTIONS\n"
-        result_dictionary += str(NUMBER_COUNT) + " NUMBERS\n"
-        result_dictionary += str(CONJUNCTION_COUNT) + " CONJUNCTIONS\n"
-        result_dictionary += str(PACKON_COUNT) + " PACKONS\n"
-        result_dictionary += ""
-
-        result_dictionary += "TOTAL: " + str(TOTAL) + "\n"
-
-        if ERROR_COUNT > 0:
-            result_dictionary += "Error lines are the following: \n"
-            for error_line in ERROR_LINES:
-                result_dictionary += error_line + "\n"
-
-        if (not HEADLESS):
-            print(result_dictionary)
-
-            print("Press 'c' if you wish to parse endings. Otherwise press any other key to exit.")
-            next = input("")
-
-            if next != 'c':
-                exit()
-        
-        if (SAVE_REPORT):
-            with open(REPORT_PATH, "w") as report_file:
-                report_file.write(result_dictionary)
+
+def _parse_dictline_range(path, start, end):
+    # Run by the worker processes
+    with open(path, "rb") as dictline_file:
+        dictline_file.seek(start)
+        data = dictline_file.read(end - start)
+
+    report = ParseReport()
+    entries = list(_parse_dictline_lines(data.decode(SOURCE_ENCODING).splitlines(), report))
+
+    return entries, report
 
 
 #################################
 #    Inflection jsonisation     #
 #################################
 
-with open(INFLECTS_PATH) as inflections_file:
-    inflections_data = inflections_file.readlines()
-
-    # As with the dictionary, remove unnecessary whitespace
-    inflections_formatted = [re.sub("\s\s+", " ", s) for s in inflections_data]
-
-    # Some endings are merely empty strings. In the original INFLECTS file, they were
-    # simply not there. For the sake of everybody's sanity, I have decided to denote
-    # such endings with NULL in the INFLECTS file (as Whitaker himself did a couple of times) 
-    # and NO_ENDING in the JSON variant.
-    inflections_formatted = [re.sub("NULL", NO_ENDING, s) for s in inflections_formatted]
-
-    # Removes any empty lines so it does not trigger false positive errors.
-    inflections_formatted = filter(lambda empty: empty.strip(), inflections_formatted)
-
-    lines = []
-    for entry in inflections_formatted:
-        lines.append(entry)
-
-    NOUN_ENDING_COUNT = 0
-    ADJECTIVE_ENDING_COUNT = 0
-    ADVERB_ENDING_COUNT = 0
-    PREPOSITION_ENDING_COUNT = 0
-    INTERJECTION_ENDING_COUNT = 0
-    VERB_ENDING_COUNT = 0
-    VPAR_ENDING_COUNT = 0
-    SUPINE_ENDING_COUNT = 0
-    PRONOUN_ENDING_COUNT = 0
-    NUMBER_ENDING_COUNT = 0
-    CONJUNCTION_ENDING_COUNT = 0
-    
-    INFLECT_ERROR_LINES = []
-    INFLECT_ERROR_COUNT = 0
-
-    json_inflects = []
-    for inflection in lines:
-        sinflection = inflection.split()
-
-        # Ignore commented lines
-        if sinflection[0].startswith("--"):
-            continue
+def parse_inflection(line):
+    # Returns the inflection for a single INFLECTS line or None if the line can not be parsed.
+    sinflection = line.split()
 
-        # Adverbs, prepositions, conjunctions and interjections have only a few possible "endings".
-        # They all evaluate to NO_ENDING and are unique in that they have little information about them.
-
-        if sinflection[0] == 'ADV':
-            json_inflection_adverb = {
-                "pos": sinflection[0],
-                "comparison": sinflection[1],
-                "stem": int(sinflection[2]),
-                "characters": int(sinflection[3]),
-                "ending": sinflection[4],
-                "age": sinflection[5],
-                "frequency": sinflection[6]
-            }
-            json_inflects.append(json_inflection_adverb)
-            ADVERB_ENDING_COUNT += 1
-            continue
+    if not sinflection:
+        return None
 
-        if sinflection[0] == 'PREP':
-            json_inflection_preposition = {
-                "pos": sinflection[0],
-                "case": sinflection[1],
-                "stem": int(sinflection[2]),
-                "characters": int(sinflection[3]),
-                "ending": sinflection[4],
-                "age": sinflection[5],
-                "frequency": sinflection[6]
-            }
-            json_inflects.append(json_inflection_preposition)
-            PREPOSITION_ENDING_COUNT += 1
-            continue
+    extract = INFLECTS_DISPATCH.get(sinflection[0])
 
-        if sinflection[0] == 'CONJ':
-            json_inflection_conjunction = {
-                "pos": sinflection[0],
-                "stem": int(sinflection[1]),
-                "characters": int(sinflection[2]),
-                "ending": sinflection[3],
-                "age": sinflection[4],
-                "frequency": sinflection[5]
-            }
-            json_inflects.append(json_inflection_conjunction)
-            CONJUNCTION_ENDING_COUNT += 1
-            continue
+    if extract is None:
+        return None
 
-        if sinflection[0] == 'INTERJ':
-            json_inflection_interjection = {
-                "pos": sinflection[0],
-                "stem": int(sinflection[1]),
-                "characters": int(sinflection[2]),
-                "ending": sinflection[3],
-                "age": sinflection[4],
-                "frequency": sinflection[5]
-            }
-            json_inflects.append(json_inflection_interjection)
-            INTERJECTION_ENDING_COUNT += 1
-            continue
+    # Anything after the fields (such as a trailing comment) is ignored
+    try:
+        return extract(sinflection)
+    except (IndexError, ValueError):
+        return None
 
-        if sinflection[0] == 'N':
-            json_inflection_noun = {
-                "pos": sinflection[0],
-                "declension": int(sinflection[1]),
-                "declension_variant": int(sinflection[2]),
-                "case": sinflection[3],
-                "number": sinflection[4],
-                "gender": sinflection[5],
-                "stem": int(sinflection[6]),
-                "characters": int(sinflection[7]),
-                "ending": sinflection[8],
-                "age": sinflection[9],
-                "frequency": sinflection[10]
-            }
-            json_inflects.append(json_inflection_noun)
-            NOUN_ENDING_COUNT += 1
-            continue
 
-        if sinflection[0] == 'ADJ':
-            json_inflection_adjective = {
-                "pos": sinflection[0],
-                "declension": int(sinflection[1]),
-                "declension_variant": int(sinflection[2]),
-                "case": sinflection[3],
-                "number": sinflection[4],
-                "gender": sinflection[5],
-                "comparison": sinflection[6],
-                "stem": int(sinflection[7]),
-                "characters": int(sinflection[8]),
-                "ending": sinflection[9],
-                "age": sinflection[10],
-                "frequency": sinflection[11]
-            }
-            json_inflects.append(json_inflection_adjective)
-            ADJECTIVE_ENDING_COUNT += 1
-            continue
+def iter_inflects(path = INFLECTS_PATH, report = None):
+    # Yields the inflections of the INFLECTS file one at a time, in file order.
+    with open(path, encoding = SOURCE_ENCODING) as inflections_file:
+        yield from _parse_inflects_lines(inflections_file, report)
 
-        if sinflection[0] == 'V':
-            json_inflection_verb = {
-                "pos": sinflection[0],
-                "conjugation": int(sinflection[1]),
-                "conjugation_variant": int(sinflection[2]),
-                "tense": sinflection[3],
-                "voice": sinflection[4],
-                "mood": sinflection[5],
-                "person": sinflection[6],
-                "number": sinflection[7],
-                "stem": int(sinflection[8]),
-                "characters": int(sinflection[9]),
-                "ending": sinflection[10],
-                "age": sinflection[11],
-                "frequency": sinflection[12]
-            }
-            json_inflects.append(json_inflection_verb)
-            VERB_ENDING_COUNT += 1
-            continue
 
-        if sinflection[0] == 'VPAR':
-            json_inflection_vpar = {
-                "pos": sinflection[0],
-                "conjugation": int(sinflection[1]),
-                "conjugation_variant": int(sinflection[2]),
-                "case": sinflection[3],
-                "number": sinflection[4],
-                "gender": sinflection[5],
-                "tense": sinflection[6],
-                "voice": sinflection[7],
-                "mood": sinflection[8],
-                "stem": int(sinflection[9]),
-                "characters": int(sinflection[10]),
-                "ending": sinflection[11],
-                "age": sinflection[12],
-                "frequency": sinflection[13]
-            }
-            json_inflects.append(json_inflection_vpar)
-            VPAR_ENDING_COUNT += 1
-            continue
+def _parse_inflects_lines(lines, report):
+    for line in lines:
+        stripped = line.strip()
 
-        if sinflection[0] == 'SUPINE':
-            json_inflection_supine = {
-                "pos": sinflection[0],
-                "conjugation": int(sinflection[1]),
-                "conjugation_variant": int(sinflection[2]),
-                "case": sinflection[3],
-                "number": sinflection[4],
-                "gender": sinflection[5],
-                "stem": int(sinflection[6]),
-                "characters": int(sinflection[7]),
-                "ending": sinflection[8],
-                "age": sinflection[9],
-                "frequency": sinflection[10]
-            }
-            json_inflects.append(json_inflection_supine)
-            SUPINE_ENDING_COUNT += 1
+        # Ignore empty and commented lines so they do not trigger false positive errors.
+        if not stripped or stripped.startswith("--"):
             continue
 
-        if sinflection[0] == 'PRON':
-            json_inflection_pronoun = {
-                "pos": sinflection[0],
-                "declension": int(sinflection[1]),
-                "declension_variant": int(sinflection[2]),
-                "case": sinflection[3],
-                "number": sinflection[4],
-                "gender": sinflection[5],
-                "stem": int(sinflection[6]),
-                "characters": int(sinflection[7]),
-                "ending": sinflection[8],
-                "age": sinflection[9],
-                "frequency": sinflection[10]
-            }
-            json_inflects.append(json_inflection_pronoun)
-            PRONOUN_ENDING_COUNT += 1
-            continue
+        inflection = parse_inflection(line)
 
-        if sinflection[0] == 'NUM':
-            json_inflection_number = {
-                "pos": sinflection[0],
-                "declension": int(sinflection[1]),
-                "declension_variant": int(sinflection[2]),
-                "case": sinflection[3],
-                "number": sinflection[4],
-                "gender": sinflection[5],
-                "numeral_sort": sinflection[6],
-                "stem": int(sinflection[7]),
-                "characters": int(sinflection[8]),
-                "ending": sinflection[9],
-                "age": sinflection[10],
-                "frequency": sinflection[11]
-            }
-            json_inflects.append(json_inflection_number)
-            NUMBER_ENDING_COUNT += 1
+        if inflection is None:
+            if report is not None:
+                report.errors.append("Could not parse inflection (" + " ".join(line.split()) + ").")
             continue
 
-        NOT_CONFORM = "Could not parse inflection (" + inflection + ")."
-        INFLECT_ERROR_LINES.append(NOT_CONFORM)
-        INFLECT_ERROR_COUNT += 1
+        if report is not None:
+            report.count(inflection["pos"])
+
+        yield inflection
 
-    with open(INFLECTS_JSON_PATH, "w") as endings_json_file:
 
-        if COMPACT_JSON:
-            endings_json_file.write(json.dumps(json_inflects, separators = (',', ':')))
+#################################
+#       Output and report       #
+#################################
+
+def json_encoder(compact = COMPACT_JSON, ndjson = NDJSON):
+    # Returns the function turning an entry into its JSON within the file
+    if compact:
+        return json.JSONEncoder(separators = (',', ':')).encode
+    if ndjson:
+        return json.JSONEncoder().encode
+
+    encode = json.JSONEncoder(indent = 4).encode
+
+    # Each entry is nested one level deeper within the array
+    return lambda entry: encode(entry).replace("\n", "\n    ")
+
+
+def write_json(entries, path, compact = COMPACT_JSON, ndjson = NDJSON, offsets = None):
+    # Writes the entries to the file as they come, so neither all the entries nor the whole JSON document are
+    # ever held in memory. The entries are written either as a JSON array (the same as json.dumps of a list
+    # of them would give) or as NDJSON, one entry per line.
+    #
+    # If given, offsets.add(offset, length) is called with the position of each entry's JSON within the file
+    # (such as by random_access.OffsetIndexWriter). The JSON is pure ASCII, so its characters are its bytes.
+    encode = json_encoder(compact, ndjson)
+    write_json_texts((encode(entry) for entry in entries), path, compact, ndjson, offsets)
+
+
+def json_framing(compact = COMPACT_JSON, ndjson = NDJSON):
+    # Returns what goes before the first entry, between the entries and after the last one, and what an empty file
+    # holds
+    if ndjson:
+        return "", "\n", "\n", ""
+    if compact:
+        return "[", ",", "]", "[]"
+
+    return "[\n    ", ",\n    ", "\n]", "[]"
+
+
+def write_json_texts(texts, path, compact = COMPACT_JSON, ndjson = NDJSON, offsets = None):
+    # Same as write_json, but for entries which were already turned into JSON by json_encoder
+    prefix, separator, end, empty = json_framing(compact, ndjson)
+
+    with open(path, "w", newline = "\n") as json_file:
+        position = 0
+        written = False
+
+        for text in texts:
+            json_file.write(prefix + text)
+
+            if offsets is not None:
+                offsets.add(position + len(prefix), len(text))
+            position += len(prefix) + len(text)
+
+            prefix = separator
+            written = True
+
+        json_file.write(end if written else empty)
+
+
+def iter_json(path):
+    # Yields the entries of a converted file, either JSON or (by its extension) NDJSON. An NDJSON file is read an
+    # entry at a time, while a JSON file is parsed whole.
+    with open(path) as json_file:
+        if Path(path).suffix == ".ndjson":
+            for line in json_file:
+                yield json.loads(line)
         else:
-            endings_json_file.write(json.dumps(json_inflects, indent = 4))
-
-        TOTAL = (ADVERB_ENDING_COUNT 
-                + PREPOSITION_ENDING_COUNT
-                + CONJUNCTION_ENDING_COUNT
-                + INTERJECTION_ENDING_COUNT 
-                + NOUN_ENDING_COUNT 
-                + ADJECTIVE_ENDING_COUNT 
-                + VERB_ENDING_COUNT 
-                + VPAR_ENDING_COUNT 
-                + SUPINE_ENDING_COUNT 
-                + PRONOUN_ENDING_COUNT 
-                + NUMBER_ENDING_COUNT)
-
-        result_inflections = "\nFinished parsing and saved the JSON inflections document with (" + str(INFLECT_ERROR_COUNT) + ") errors.\n"
-        result_inflections += "Successfully parsed:\n"
-
-        result_inflections += ""
-        result_inflections += str(NOUN_ENDING_COUNT) + " NOUNS\n"
-        result_inflections += str(ADJECTIVE_ENDING_COUNT) + " ADJECTIVES\n"
-        result_inflections += str(ADVERB_ENDING_COUNT) + " ADVERBS\n"
-        result_inflections += str(PREPOSITION_ENDING_COUNT) + " PREPOSITIONS\n"
-        result_inflections += str(INTERJECTION_ENDING_COUNT) + " INTERJECTIONS\n"
-        result_inflections += str(PRONOUN_ENDING_COUNT) + " PRONOUNS\n"
-        result_inflections += str(VERB_ENDING_COUNT) + " VERBS\n"
-        result_inflections += str(VPAR_ENDING_COUNT) + " VERB PARTICIPLES\n"
-        result_inflections += str(SUPINE_ENDING_COUNT) + " SUPINES\n"
-        result_inflections += str(NUMBER_ENDING_COUNT) + " NUMBERS\n"
-        result_inflections += str(CONJUNCTION_ENDING_COUNT) + " CONJUNCTIONS\n"
-        result_inflections += ""
-
-        result_inflections += "TOTAL: " + str(TOTAL)
-
-        if INFLECT_ERROR_COUNT > 0:
-            result_inflections += "Error lines are the following:\n"
-            for inflect_error_line in INFLECT_ERROR_LINES:
-                result_inflections += inflect_error_line + "\n"
-        
-        if (not HEADLESS):
-            print(result_inflections)
-
-        if (SAVE_REPORT):
-            with open(REPORT_PATH, "a") as report_file:
-                report_file.write(result_inflections)
-
-        if (not HEADLESS):
-            input("Press any key to exit.")
+            yield from json.load(json_file)
+
+
+def load_json(path):
+    # Loads the entries of a converted file, either JSON or (by its extension) NDJSON
+    with open(path) as json_file:
+        if Path(path).suffix == ".ndjson":
+            return [json.loads(line) for line in json_file]
+        return json.load(json_file)
+
+
+def feed(entries, writers):
+    # Passes each entry on to the extra writers (objects with add(entry) and close() methods, such as
+    # binary_format.BinaryWriter) on its way to the JSON file, so all outputs are made in a single pass. The writers
+    # of each extra output are made by make_writers, and closed by convert (or incremental.convert) once the JSON
+    # file is written.
+    for entry in entries:
+        for writer in writers:
+            writer.add(entry)
+        yield entry
+
+
+def output_path(json_path, ndjson = NDJSON):
+    return json_path.with_suffix(".ndjson") if ndjson else json_path
+
+
+def offset_writer(json_path):
+    # Imported only here, as random_access is built on this very module
+    import random_access
+    return random_access.OffsetIndexWriter(random_access.offsets_path(json_path), json_path)
+
+
+def format_dictline_report(report):
+    result_dictionary = "Finished parsing and saved the JSON dictionary document with (" + str(len(report.errors)) + ") errors.\n"
+    result_dictionary += "Successfully parsed:\n"
+
+    for pos, label in DICTLINE_REPORT_LABELS:
+        result_dictionary += str(report.counts.get(pos, 0)) + " " + label + "\n"
+
+    result_dictionary += "TOTAL: " + str(report.total()) + "\n"
+
+    if report.errors:
+        result_dictionary += "Error lines are the following: \n"
+        for error_line in report.errors:
+            result_dictionary += error_line + "\n"
+
+    return result_dictionary
+
+
+def format_inflects_report(report):
+    result_inflections = "\nFinished parsing and saved the JSON inflections document with (" + str(len(report.errors)) + ") errors.\n"
+    result_inflections += "Successfully parsed:\n"
+
+    for pos, label in INFLECTS_REPORT_LABELS:
+        result_inflections += str(report.counts.get(pos, 0)) + " " + label + "\n"
+
+    result_inflections += "TOTAL: " + str(report.total())
+
+    if report.errors:
+        result_inflections += "Error lines are the following:\n"
+        for inflect_error_line in report.errors:
+            result_inflections += inflect_error_line + "\n"
+
+    return result_inflections
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description = "Converts the DICTLINE and INFLECTS files to JSON.")
+    parser.add_argument("--workers", type = int, default = WORKERS, help = "number of processes parsing DICTLINE")
+    parser.add_argument("--ndjson", action = "store_true", default = NDJSON, help = "save the entries as NDJSON, one entry per line")
+    parser.add_argument("--binary", action = "store_true", default = BINARY, help = "also save the dictionary in the compact binary format")
+    parser.add_argument("--stem-index", action = "store_true", default = STEM_INDEX, help = "also save an index of the stems")
+    parser.add_argument("--normalized-index", action = "store_true", default = NORMALIZED_INDEX, help = "also save an index of the stems with normalized spelling")
+    parser.add_argument("--senses-index", action = "store_true", default = SENSES_INDEX, help = "also save an index of the English terms of the senses")
+    parser.add_argument("--ending-index", action = "store_true", default = ENDING_INDEX, help = "also save an index of the endings")
+    parser.add_argument("--offsets", action = "store_true", default = OFFSET_INDEX, help = "also save the offsets of the entries within the JSON files")
+    parser.add_argument("--sqlite", action = "store_true", default = SQLITE, help = "also export the entries to an SQLite database")
+    parser.add_argument("--delta", action = "store_true", default = DELTA, help = "also save the delta from the previous dictionary")
+    parser.add_argument("--metrics", action = "store_true", default = METRICS, help = "time each phase of the conversion and save the metrics")
+    parser.add_argument("--trace-memory", action = "store_true", help = "also trace the peak memory of the conversion (implies --metrics)")
+    parser.add_argument("--profile", help = "save a cProfile dump of the run to this file")
+    parser.add_argument("--shards", action = "store_true", default = SHARDS, help = "also save the entries split into shards by POS")
+    parser.add_argument("--shard-prefix", type = int, choices = (0, 1, 2), default = SHARD_PREFIX, help = "also split the shards of DICTLINE by this many letters of the first stem")
+    parser.add_argument("--compress", action = "store_true", default = COMPRESS, help = "also save the JSON files compressed with gzip and lzma")
+    parser.add_argument("--compression-level", type = int, choices = range(1, 10), default = COMPRESSION_LEVEL, help = "compression level, from 1 (quickest) to 9 (smallest)")
+    parser.add_argument("--incremental", action = "store_true", default = INCREMENTAL, help = "only convert what changed since the last conversion")
+
+    arguments = parser.parse_args()
+
+    if arguments.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if arguments.trace_memory:
+        arguments.metrics = True
+
+    return arguments
+
+
+def extra_outputs(arguments, inflects = False):
+    # Names of the extra outputs of DICTLINE (or INFLECTS) which were asked for
+    names = ("ending_index", "sqlite", "shards") if inflects else ("binary", "stem_index", "normalized_index", "senses_index", "sqlite", "delta", "shards")
+    return [name for name in names if getattr(arguments, name)]
+
+
+def make_writers(outputs, json_path, inflects = False, arguments = None):
+    # The extra outputs are imported only here, as they are built on this very module. arguments are those of the
+    # command line, for the outputs which have settings of their own.
+    writers = []
+
+    for name in outputs:
+        if name == "binary":
+            import binary_format
+            writers.append(binary_format.BinaryWriter())
+        elif name == "stem_index":
+            import indexes
+            writers.append(indexes.StemIndexWriter(json_path = json_path))
+        elif name == "normalized_index":
+            import indexes
+            writers.append(indexes.NormalizedStemIndexWriter(json_path = json_path))
+        elif name == "senses_index":
+            import indexes
+            writers.append(indexes.SensesIndexWriter(json_path = json_path))
+        elif name == "ending_index":
+            import indexes
+            writers.append(indexes.EndingIndexWriter())
+        elif name == "sqlite":
+            import sqlite_export
+            writers.append(sqlite_export.InflectsWriter() if inflects else sqlite_export.DictlineWriter())
+        elif name == "delta":
+            import delta
+            writers.append(delta.DeltaWriter(json_path))
+        elif name == "shards":
+            import shards
+            writers.append(shards.ShardWriter(json_path, 0 if inflects else arguments.shard_prefix))
+
+    return writers
+
+
+def extra_output_paths(outputs, json_path, inflects = False):
+    # The files the writers of the extra outputs make, so incremental conversions can tell they are still there as
+    # they were made. The deltas are left out, as they are only made when the dictionary changed.
+    paths = []
+
+    for name in outputs:
+        if name == "binary":
+            import binary_format
+            paths.append(binary_format.BINARY_PATH)
+        elif name == "stem_index":
+            import indexes
+            paths.append(indexes.STEM_INDEX_PATH)
+        elif name == "normalized_index":
+            import indexes
+            paths.append(indexes.NORMALIZED_INDEX_PATH)
+        elif name == "senses_index":
+            import indexes
+            paths.append(indexes.SENSES_INDEX_PATH)
+        elif name == "ending_index":
+            import indexes
+            paths.append(indexes.ENDING_INDEX_PATH)
+        elif name == "sqlite":
+            import sqlite_export
+            paths.append(sqlite_export.SQLITE_PATH)
+        elif name == "shards":
+            import shards
+            paths += shards.output_paths(json_path)
+
+    return paths
+
+
+def convert(entries, path, writers, arguments, metrics = None):
+    # Writes the entries to the JSON file and the extra writers. If given, metrics (see metrics.py) times each phase.
+    # The writers are only closed once the JSON file is written, as the indexes record its hash.
+    offsets = offset_writer(path) if arguments.offsets else None
+
+    if metrics is None:
+        write_json(feed(entries, writers), path, ndjson = arguments.ndjson, offsets = offsets)
+    else:
+        if writers:
+            entries = metrics.timed(feed(entries, writers), "extras")
+
+        texts = metrics.timed(map(json_encoder(ndjson = arguments.ndjson), entries), "serialize")
+
+        metrics.enter("write")
+        write_json_texts(texts, path, ndjson = arguments.ndjson, offsets = offsets)
+        metrics.leave()
+
+        metrics.enter("extras")
+
+    for writer in writers + [offsets]:
+        if writer is not None:
+            writer.close()
+
+    if metrics is not None:
+        metrics.leave()
+
+
+def run(arguments):
+    # Set up the output directory in case it doesn't exist
+    Path(OUTPUT_DIRECTORY_PATH).mkdir(exist_ok = True)
+
+    # Imported only here, as it is built on this very module
+    if arguments.metrics:
+        import metrics
+
+    files_metrics = {}
+
+    # The files are compressed in the background, while the next one is converted
+    if arguments.compress:
+        import compression
+        compressor = compression.Compressor(arguments.compression_level, only_stale = arguments.incremental)
+    else:
+        compressor = None
+
+    dictline_path = output_path(DICTLINE_JSON_PATH, arguments.ndjson)
+    dictline_extras = extra_outputs(arguments)
+    dictline_metrics = metrics.Metrics() if arguments.metrics else None
+
+    if dictline_metrics is not None:
+        dictline_metrics.start(arguments.trace_memory)
+
+    if arguments.incremental:
+        import incremental
+
+        # The prefix length of the shards changes what they hold, but not which outputs there are
+        dictline_settings = {"shard_prefix": arguments.shard_prefix} if "shards" in dictline_extras else None
+
+        if dictline_metrics is not None:
+            dictline_metrics.enter("incremental")
+
+        dictline_report = incremental.convert(DICTLINE_PATH, dictline_path, _parse_dictline_lines, lambda: make_writers(dictline_extras, dictline_path, arguments = arguments), dictline_extras, arguments.ndjson, arguments.workers, dictline_settings, lambda: extra_output_paths(dictline_extras, dictline_path))
+
+        if dictline_metrics is not None:
+            dictline_metrics.leave()
+    else:
+        dictline_report = ParseReport()
+
+        if arguments.workers > 1:
+            dictline_entries = iter_dictline_parallel(DICTLINE_PATH, dictline_report, arguments.workers)
+        elif dictline_metrics is not None:
+            dictline_entries = _parse_dictline_lines(metrics.read_lines(DICTLINE_PATH, dictline_metrics), dictline_report)
+        else:
+            dictline_entries = iter_dictline(DICTLINE_PATH, dictline_report)
+
+        if dictline_metrics is not None:
+            dictline_entries = metrics.parsed(dictline_entries, dictline_metrics)
+
+        convert(dictline_entries, dictline_path, make_writers(dictline_extras, dictline_path, arguments = arguments), arguments, dictline_metrics)
+
+    if compressor is not None:
+        for path in compression.compressed_outputs(dictline_path, "shards" in dictline_extras):
+            compressor.add(path)
+
+    result_dictionary = format_dictline_report(dictline_report)
+
+    if dictline_metrics is not None:
+        dictline_metrics.stop()
+        files_metrics["DICTLINE"] = dictline_metrics
+        metrics.save_metrics(files_metrics)
+        result_dictionary += metrics.format_metrics(dictline_metrics, DICTLINE_REPORT_LABELS)
+
+    if (not HEADLESS):
+        print(result_dictionary)
+
+        print("Press 'c' if you wish to parse endings. Otherwise press any other key to exit.")
+        next = input("")
+
+        if next != 'c':
+            if compressor is not None:
+                print(compression.format_compression(compressor.close()))
+            return
+
+    if (SAVE_REPORT):
+        with open(REPORT_PATH, "w") as report_file:
+            report_file.write(result_dictionary)
+
+    inflects_path = output_path(INFLECTS_JSON_PATH, arguments.ndjson)
+    inflects_extras = extra_outputs(arguments, inflects = True)
+    inflects_metrics = metrics.Metrics() if arguments.metrics else None
+
+    if inflects_metrics is not None:
+        inflects_metrics.start(arguments.trace_memory)
+
+    if arguments.incremental:
+        import incremental
+
+        if inflects_metrics is not None:
+            inflects_metrics.enter("incremental")
+
+        inflects_report = incremental.convert(INFLECTS_PATH, inflects_path, _parse_inflects_lines, lambda: make_writers(inflects_extras, inflects_path, inflects = True, arguments = arguments), inflects_extras, arguments.ndjson, output_paths = lambda: extra_output_paths(inflects_extras, inflects_path, inflects = True))
+
+        if inflects_metrics is not None:
+            inflects_metrics.leave()
+    else:
+        inflects_report = ParseReport()
+
+        if inflects_metrics is not None:
+            inflects_entries = metrics.parsed(_parse_inflects_lines(metrics.read_lines(INFLECTS_PATH, inflects_metrics), inflects_report), inflects_metrics)
+        else:
+            inflects_entries = iter_inflects(INFLECTS_PATH, inflects_report)
+
+        convert(inflects_entries, inflects_path, make_writers(inflects_extras, inflects_path, inflects = True, arguments = arguments), arguments, inflects_metrics)
+
+    if compressor is not None:
+        for path in compression.compressed_outputs(inflects_path, "shards" in inflects_extras):
+            compressor.add(path)
+
+    result_inflections = format_inflects_report(inflects_report)
+
+    if inflects_metrics is not None:
+        inflects_metrics.stop()
+        files_metrics["INFLECTS"] = inflects_metrics
+        metrics.save_metrics(files_metrics)
+        result_inflections += "\n" + metrics.format_metrics(inflects_metrics, INFLECTS_REPORT_LABELS)
+
+    if compressor is not None:
+        result_inflections += compression.format_compression(compressor.close())
+
+    if (not HEADLESS):
+        print(result_inflections)
+
+    if (SAVE_REPORT):
+        with open(REPORT_PATH, "a") as report_file:
+            report_file.write(result_inflections)
+
+    if (not HEADLESS):
+        input("Press any key to exit.")
+
+
+def main():
+    arguments = parse_arguments()
+
+    if arguments.profile is None:
+        run(arguments)
+    else:
+        profiler = cProfile.Profile()
+        profiler.runcall(run, arguments)
+        profiler.dump_stats(arguments.profile)
+
+
+if __name__ == "__main__":
+    main()
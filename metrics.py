@@ -0,0 +1,169 @@
+import json
+import time
+import tracemalloc
+
+from datetime import datetime
+
+import jsonisator
+
+# Instrumentation of a conversion, turned on with --metrics.
+#
+# The conversion streams each entry through all of its phases (reading its line, parsing it, passing it to the
+# extra writers, serializing and writing it) before the next one is read, so the phases can't be timed one after
+# the other. Instead, each phase is a generator wrapped by Metrics.timed, which times every step of it. The phases
+# pull from one another, so the time of a step is only charged to its own phase, not to those it pulls from: the
+# time of the phases adds up to that of the whole conversion. Reading the clocks at every step makes the conversion
+# about a third slower, so the metrics compare best with one another rather than with runs without them.
+#
+# The time taken to parse each entry is also charged to its POS, which gives the throughput of each branch of the
+# parser. With --trace-memory, the peak of the memory allocated during the conversion is traced by tracemalloc
+# (which slows the conversion down a lot, so the times are best taken without it).
+#
+# With more than one worker, the parse phase is the time spent waiting for the workers (including their reading).
+
+METRICS_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / str("METRICS-" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S") + ".json")
+
+# Phases in the order they are listed in the report
+PHASES = ("read", "parse", "extras", "serialize", "write", "incremental")
+
+
+def _clocks():
+    return time.perf_counter(), time.process_time()
+
+
+class Metrics:
+    # Wall and CPU time of the phases of converting a single file
+
+    def __init__(self):
+        # Phase -> [wall time, CPU time]
+        self.phases = {}
+
+        # POS -> [entries, wall time, CPU time] of parsing them
+        self.branches = {}
+
+        # Phases being timed, innermost last, and the time the innermost one was last charged
+        self.stack = []
+        self.mark = None
+
+        self.started = None
+        self.total = None
+        self.memory_peak = None
+
+    def start(self, trace_memory = False):
+        if trace_memory:
+            tracemalloc.start()
+
+        self.started = _clocks()
+
+    def stop(self):
+        wall, cpu = _clocks()
+        self.total = [wall - self.started[0], cpu - self.started[1]]
+
+        if tracemalloc.is_tracing():
+            self.memory_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def _charge(self):
+        # Charges the time since the last mark to the innermost phase
+        wall, cpu = _clocks()
+
+        if self.stack:
+            totals = self.phases.setdefault(self.stack[-1], [0.0, 0.0])
+            totals[0] += wall - self.mark[0]
+            totals[1] += cpu - self.mark[1]
+
+        self.mark = (wall, cpu)
+
+    def enter(self, name):
+        self._charge()
+        self.stack.append(name)
+
+    def leave(self):
+        self._charge()
+        self.stack.pop()
+
+    def timed(self, iterable, name, branch = None):
+        # Yields the items of the iterable, charging the time taken to get each of them to the phase. If given,
+        # branch(item) is the branch the time of the item is also charged to.
+        iterator = iter(iterable)
+        totals = self.phases.setdefault(name, [0.0, 0.0])
+
+        while True:
+            wall, cpu = totals
+            self.enter(name)
+
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.leave()
+
+            if branch is not None:
+                counts = self.branches.setdefault(branch(item), [0, 0.0, 0.0])
+                counts[0] += 1
+                counts[1] += totals[0] - wall
+                counts[2] += totals[1] - cpu
+
+            yield item
+
+    def to_dict(self):
+        return {
+            "wall": self.total[0],
+            "cpu": self.total[1],
+            "memory_peak": self.memory_peak,
+            "phases": {name: {"wall": wall, "cpu": cpu} for name, (wall, cpu) in self.phases.items()},
+            "branches": {
+                pos: {"entries": count, "wall": wall, "cpu": cpu, "entries_per_second": count / wall if wall else None}
+                for pos, (count, wall, cpu) in self.branches.items()
+            }
+        }
+
+
+def read_lines(path, metrics):
+    # Yields the lines of the source file, timed as the read phase
+    with open(path, encoding = jsonisator.SOURCE_ENCODING) as source_file:
+        yield from metrics.timed(source_file, "read")
+
+
+def parsed(entries, metrics):
+    # Yields the entries, timed as the parse phase and by their POS
+    return metrics.timed(entries, "parse", lambda entry: entry["pos"])
+
+
+def _seconds(value):
+    return str(round(value, 3)) + " s"
+
+
+def format_metrics(metrics, labels):
+    # The metrics for the report. labels are those of the POS in the report (such as DICTLINE_REPORT_LABELS).
+    result = "Wall time: " + _seconds(metrics.total[0]) + ", CPU time: " + _seconds(metrics.total[1]) + "\n"
+
+    if metrics.memory_peak is not None:
+        result += "Peak traced memory: " + str(round(metrics.memory_peak / 1000000, 1)) + " MB\n"
+
+    result += "Phases (wall / CPU):\n"
+    for name in PHASES:
+        if name in metrics.phases:
+            wall, cpu = metrics.phases[name]
+            result += name + ": " + _seconds(wall) + " / " + _seconds(cpu) + "\n"
+
+    if metrics.branches:
+        result += "Parsing throughput:\n"
+        for pos, label in labels:
+            if pos in metrics.branches:
+                count, wall, cpu = metrics.branches[pos]
+                result += label + ": " + str(count) + " in " + _seconds(wall) + " / " + _seconds(cpu)
+                result += " (" + str(round(count / wall) if wall else "-") + " per second)\n"
+
+    return result
+
+
+def save_metrics(files, path = METRICS_PATH):
+    # Saves the metrics of each converted file (name -> Metrics) as JSON
+    with open(path, "w") as metrics_file:
+        json.dump({
+            "date": datetime.now().isoformat(timespec = "seconds"),
+            "converter": jsonisator.CONVERTER_VERSION,
+            "files": {name: metrics.to_dict() for name, metrics in files.items()}
+        }, metrics_file, indent = 4)
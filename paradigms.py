@@ -0,0 +1,135 @@
+import json
+import sys
+import time
+
+from pathlib import Path
+
+import analysis
+import jsonisator
+
+# Generates every inflected form of the dictionary entries: the stem an inflection asks for joined with its ending,
+# for every inflection applying to the entry (by the same rules as analysis.py).
+#
+# The inflections are grouped once into tables by the POS of the entries they apply to, their declension/conjugation
+# and variant. Since 0 is a wildcard (see analysis.class_applies), the inflections of an entry of class C and
+# variant V are those of the tables (POS, 0, 0), (POS, C, 0) and (POS, C, V). Entries which agree in everything
+# the inflections depend on share their paradigm, so it is only put together (as a list of stem numbers, endings
+# and inflections) the first time, after which generating the forms of an entry only takes joining its stems with
+# the endings.
+
+FORMS_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "FORMS.ndjson"
+
+
+class Paradigms:
+
+    def __init__(self, inflections):
+        self.inflections = inflections
+
+        # (POS of the entries, class, variant) -> [inflection number]. Inflections of class 0 apply to all
+        # variants, so they are all kept under variant 0.
+        self.tables = {}
+
+        for number, inflection in enumerate(inflections):
+            inflection_class = inflection.get("declension", inflection.get("conjugation", 0))
+            inflection_variant = inflection.get("declension_variant", inflection.get("conjugation_variant", 0))
+
+            if inflection_class == 0:
+                inflection_variant = 0
+
+            for pos in analysis.INFLECTION_POS[inflection["pos"]]:
+                self.tables.setdefault((pos, inflection_class, inflection_variant), []).append(number)
+
+        # Paradigm key (see _key) -> ((stem number, ending, inflection number), ...)
+        self.paradigms = {}
+
+    @classmethod
+    def load(cls, inflects_path = jsonisator.INFLECTS_JSON_PATH):
+        return cls(jsonisator.load_json(inflects_path))
+
+    def _key(self, entry):
+        # Everything about an entry its inflections depend on (see analysis.agrees)
+        return (entry["pos"],) + analysis.entry_class(entry) + (entry.get("gender"), entry.get("comparison"), entry.get("case"))
+
+    def paradigm(self, entry):
+        # Returns the (stem number, ending, inflection number) of every inflection applying to the entry
+        key = self._key(entry)
+        paradigm = self.paradigms.get(key)
+
+        if paradigm is None:
+            pos, entry_class, entry_variant = key[:3]
+
+            table_keys = [(pos, 0, 0)]
+            if entry_class != 0:
+                table_keys.append((pos, entry_class, 0))
+                if entry_variant != 0:
+                    table_keys.append((pos, entry_class, entry_variant))
+
+            paradigm = []
+
+            for table_key in table_keys:
+                for number in self.tables.get(table_key, ()):
+                    inflection = self.inflections[number]
+
+                    if analysis.agrees(entry, inflection):
+                        ending = "" if inflection["ending"] == jsonisator.NO_ENDING else inflection["ending"]
+                        paradigm.append((inflection["stem"], ending, number))
+
+            paradigm.sort(key = lambda item: item[2])
+            paradigm = self.paradigms[key] = tuple(paradigm)
+
+        return paradigm
+
+    def generate_forms(self, entry):
+        # Returns (form, inflection number) for every form of the entry, in the order of the inflections
+        stems = entry["stems"]
+        count = len(stems)
+
+        return [
+            (stems[stem - 1] + ending, number)
+            for stem, ending, number in self.paradigm(entry)
+            if stem <= count and stems[stem - 1] != jsonisator.NO_STEM
+        ]
+
+
+_default_paradigms = None
+
+
+def generate_forms(entry):
+    # Generates the forms of an entry using the converted INFLECTS in the output directory, loaded on first use
+    global _default_paradigms
+
+    if _default_paradigms is None:
+        _default_paradigms = Paradigms.load()
+
+    return _default_paradigms.generate_forms(entry)
+
+
+def write_forms(entries, paradigms, path = FORMS_PATH):
+    # Writes the forms of all the entries as NDJSON, one {"entry": number, "forms": [[form, inflection], ...]}
+    # per line, as they are generated. Returns the number of forms written.
+    count = 0
+
+    with open(path, "w") as forms_file:
+        for number, entry in enumerate(entries):
+            forms = paradigms.generate_forms(entry)
+            forms_file.write('{"entry":' + str(number) + ',"forms":' + json.dumps(forms, separators = (',', ':')) + '}\n')
+            count += len(forms)
+
+    return count
+
+
+if __name__ == "__main__":
+    # Writes the forms of every entry of the dictionary:
+    #
+    #   python paradigms.py [DICTLINE.json] [INFLECTS.json] [FORMS.ndjson]
+    dictline_path = Path(sys.argv[1]) if len(sys.argv) > 1 else jsonisator.DICTLINE_JSON_PATH
+    inflects_path = Path(sys.argv[2]) if len(sys.argv) > 2 else jsonisator.INFLECTS_JSON_PATH
+    forms_path = Path(sys.argv[3]) if len(sys.argv) > 3 else FORMS_PATH
+
+    start = time.perf_counter()
+
+    entries = jsonisator.load_json(dictline_path)
+    paradigms = Paradigms.load(inflects_path)
+    count = write_forms(entries, paradigms, forms_path)
+
+    print("Wrote " + str(count) + " forms of " + str(len(entries)) + " entries in " + str(round(time.perf_counter() - start, 2)) + " s.")
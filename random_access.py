@@ -0,0 +1,154 @@
+import hashlib
+import json
+import mmap
+import struct
+
+from array import array
+from pathlib import Path
+
+import jsonisator
+
+# Random access to the entries of the JSON files, without loading them.
+#
+# When asked to (see jsonisator.OFFSET_INDEX), the converter saves the offset and length of every entry's JSON
+# within the file next to it, as FILE.offsets (such as DICTLINE.json.offsets). Both files are then memory-mapped
+# and only the entries which are asked for are decoded, so opening the dictionary only takes the time to hash the
+# JSON file (see below), rather than to parse it. The offsets file is laid out as follows (all numbers are little-endian):
+#
+# - header (see HEADER)
+# - offsets of the entries (u64 each)
+# - lengths of the entries (u32 each)
+#
+# The header also records the hash of the JSON file the offsets were taken from (see content_hash). A JSON file
+# which was written again without its offsets (such as without --offsets) no longer has that hash, so the offsets
+# file is then rejected rather than read at the wrong places.
+
+MAGIC = b"WWOFFS"
+FORMAT_VERSION = 3
+
+# magic, format version, number of entries, hash of the JSON file
+HEADER = struct.Struct("<6sHQ16s")
+
+
+def content_hash(data):
+    # Hash of the contents of a file (given as bytes or a memory map of it), recorded by the files which refer to
+    # the positions of entries within it
+    return hashlib.blake2b(data, digest_size = 16).digest()
+
+
+def file_hash(path):
+    with open(path, "rb") as hashed_file:
+        with mmap.mmap(hashed_file.fileno(), 0, access = mmap.ACCESS_READ) as data:
+            return content_hash(data)
+
+
+def offsets_path(json_path):
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.name + ".offsets")
+
+
+class OffsetIndexWriter:
+    # Collects the offsets given to add() by jsonisator.write_json and writes them once closed, which has to be after
+    # the JSON file at json_path was written
+
+    def __init__(self, path, json_path):
+        self.path = path
+        self.json_path = json_path
+        self.offsets = array("Q")
+        self.lengths = array("I")
+
+    def add(self, offset, length):
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+    def close(self):
+        # The arrays are written as they are in memory, which has to be little-endian
+        offsets, lengths = self.offsets, self.lengths
+
+        if struct.pack("=H", 1) != struct.pack("<H", 1):
+            offsets, lengths = array("Q", offsets), array("I", lengths)
+            offsets.byteswap()
+            lengths.byteswap()
+
+        with open(self.path, "wb") as offsets_file:
+            offsets_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(offsets), file_hash(self.json_path)))
+            offsets_file.write(offsets.tobytes())
+            offsets_file.write(lengths.tobytes())
+
+
+class RandomAccessFile:
+    # Reads single entries of a JSON (or NDJSON) file saved along with its offsets.
+    #
+    # Both files are memory-mapped read-only and nothing else is kept open, so an instance can be shared with
+    # forked worker processes as it is (they all read the same pages of the page cache). It is pickled as its
+    # paths only, so it can also be handed to processes which aren't forked, which then map the files themselves.
+
+    def __init__(self, json_path, index_path = None):
+        self.json_path = Path(json_path)
+        self.index_path = offsets_path(json_path) if index_path is None else Path(index_path)
+        self._open()
+
+    def _open(self):
+        self.data = _map(self.json_path)
+        self.index = _map(self.index_path)
+
+        magic, version, self.count, json_hash = HEADER.unpack_from(self.index, 0)
+
+        if magic != MAGIC:
+            raise ValueError("Not an offsets file.")
+        if version != FORMAT_VERSION:
+            raise ValueError("Unsupported offsets version (" + str(version) + ").")
+        if json_hash != content_hash(self.data):
+            raise ValueError("The offsets file doesn't match " + self.json_path.name + ", which was written again since (save the offsets along with it).")
+
+        self.lengths_offset = HEADER.size + self.count * 8
+
+    def __getstate__(self):
+        return {"json_path": self.json_path, "index_path": self.index_path}
+
+    def __setstate__(self, state):
+        self.json_path = state["json_path"]
+        self.index_path = state["index_path"]
+        self._open()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("entry index out of range")
+
+        return json.loads(self.text(index))
+
+    def text(self, index):
+        # The JSON of the entry as it is in the file, without decoding it
+        (offset,) = struct.unpack_from("<Q", self.index, HEADER.size + index * 8)
+        (length,) = struct.unpack_from("<I", self.index, self.lengths_offset + index * 4)
+
+        return str(self.data[offset:offset + length], "ascii")
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def get_many(self, indexes):
+        return [self[index] for index in indexes]
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+
+def _map(path):
+    with open(path, "rb") as mapped_file:
+        return mmap.mmap(mapped_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+
+def open_dictline(json_path = jsonisator.DICTLINE_JSON_PATH):
+    return RandomAccessFile(json_path)
+
+
+def open_inflects(json_path = jsonisator.INFLECTS_JSON_PATH):
+    return RandomAccessFile(json_path)
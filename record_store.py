@@ -0,0 +1,171 @@
+from array import array
+from collections.abc import Mapping, Sequence
+
+import jsonisator
+
+# A compact in-memory store of the dictionary entries, for processes which keep the whole dictionary loaded.
+#
+# A list of dicts (as json.load gives) costs several hundred bytes per entry before counting the values: every
+# entry has its own hash table of keys, and every value is an object of its own. The store instead keeps the
+# entries in columns, one array per field, the same way binary_format.py lays them out on disk:
+#
+# - POS and the string fields (gender, age, frequency, the *_kind fields etc.), which only ever take one of a handful
+#   of values, as their code within a table of (interned) strings
+# - the number fields as arrays of ints
+# - the stems and senses of all entries in a single string, each entry only keeping where its own start
+#
+# Fields an entry's POS doesn't have are left at 0 in their columns. Which fields an entry has (and in which order)
+# is taken from jsonisator.DICTLINE_SCHEMA, so store[number] can be used in place of the entry's dict (entry["pos"],
+# entry.get("gender"), "declension" in entry etc.) and store[number].to_dict() gives back the very same dict.
+
+# Separates the stems and the senses of an entry within the text of the store. Neither of them can hold a tab, as
+# the parser splits the lines on whitespace.
+SEPARATOR = "\t"
+
+
+def _layouts():
+    # POS -> (number of stems, ((field, whether it is a number), ...)) for the fields between the POS and the senses
+    layouts = {}
+
+    for pos, (stem_count, _, fields) in jsonisator.DICTLINE_SCHEMA.items():
+        fields = fields + tuple((name, str) for name in jsonisator.DICTLINE_COMMON_FIELDS)
+        layouts[pos] = (stem_count, tuple((name, convert is int) for name, convert in fields))
+
+    return layouts
+
+
+LAYOUTS = _layouts()
+
+
+class RecordStore(Sequence):
+
+    def __init__(self, entries = ()):
+        self.strings = []
+        self.codes = {}
+
+        self.pos = array("H")
+        self.columns = {}
+
+        for _, fields in LAYOUTS.values():
+            for name, number in fields:
+                self.columns.setdefault(name, array("i" if number else "H"))
+
+        # Start of the text of every entry within self.text, followed by the end of the last one
+        self.offsets = array("I", [0])
+        texts = []
+        length = 0
+
+        for entry in entries:
+            pos = entry["pos"]
+            _, fields = LAYOUTS[pos]
+            present = set()
+
+            self.pos.append(self._code(pos))
+
+            for name, number in fields:
+                self.columns[name].append(entry[name] if number else self._code(entry[name]))
+                present.add(name)
+
+            for name, column in self.columns.items():
+                if name not in present:
+                    column.append(0)
+
+            text = SEPARATOR.join(entry["stems"]) + SEPARATOR + entry["senses"]
+            texts.append(text)
+            length += len(text)
+            self.offsets.append(length)
+
+        self.text = "".join(texts)
+
+    @classmethod
+    def load(cls, path = jsonisator.DICTLINE_JSON_PATH):
+        # Loads the store from DICTLINE.json. An .ndjson file is read an entry at a time, so the whole dictionary
+        # is never held as dicts.
+        return cls(jsonisator.iter_json(path))
+
+    def _code(self, value):
+        code = self.codes.get(value)
+
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+
+        return code
+
+    def __len__(self):
+        return len(self.pos)
+
+    def __getitem__(self, number):
+        if isinstance(number, slice):
+            return [Record(self, index) for index in range(*number.indices(len(self)))]
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError("Entry " + str(number) + " is not in the store.")
+
+        return Record(self, number)
+
+    def to_dicts(self):
+        return [record.to_dict() for record in self]
+
+
+class Record(Mapping):
+    # View of a single entry of a store. Behaves as a read-only dict of the entry.
+
+    __slots__ = ("store", "number")
+
+    def __init__(self, store, number):
+        self.store = store
+        self.number = number
+
+    def _pos(self):
+        return self.store.strings[self.store.pos[self.number]]
+
+    def _text(self):
+        offsets = self.store.offsets
+        return self.store.text[offsets[self.number]:offsets[self.number + 1]].split(SEPARATOR)
+
+    def _field(self, name, number):
+        value = self.store.columns[name][self.number]
+        return value if number else self.store.strings[value]
+
+    def __getitem__(self, name):
+        if name == "pos":
+            return self._pos()
+        if name == "stems":
+            return tuple(self._text()[:-1])
+        if name == "senses":
+            return self._text()[-1]
+
+        for field, number in LAYOUTS[self._pos()][1]:
+            if field == name:
+                return self._field(name, number)
+
+        raise KeyError(name)
+
+    def __iter__(self):
+        yield "stems"
+        yield "pos"
+        for name, _ in LAYOUTS[self._pos()][1]:
+            yield name
+        yield "senses"
+
+    def __len__(self):
+        return len(LAYOUTS[self._pos()][1]) + 3
+
+    def __repr__(self):
+        return "Record(" + repr(self.to_dict()) + ")"
+
+    def to_dict(self):
+        # The entry as the parser gives it, ready to be turned into JSON
+        pos = self._pos()
+        text = self._text()
+
+        entry = {"stems": tuple(text[:-1]), "pos": pos}
+
+        for name, number in LAYOUTS[pos][1]:
+            entry[name] = self._field(name, number)
+
+        entry["senses"] = text[-1]
+
+        return entry
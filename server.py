@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import json
+
+from urllib.parse import unquote
+
+import analysis
+import jsonisator
+
+# A small HTTP server handing out the converted dictionary. It answers GET requests of the form:
+#
+# - /entry/ID       the entry at position ID within DICTLINE.json
+# - /stem/STEM      every entry having the stem, as {"id", "stem_number", "entry"}
+# - /analyze/FORM   every analysis of the form, as {"id", "inflection_id", "stem", "ending", "entry", "inflection"}
+#
+# The JSON of every entry and inflection is serialised once at startup, so answering a request only takes joining
+# a few of them together.
+
+HOST = "127.0.0.1"
+PORT = 8080
+
+# Longest request line and header lines accepted
+MAX_LINE = 8192
+
+
+class Lookup:
+    # Builds the responses to the requests out of the pre-serialised entries and inflections
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.entries = [_dumps(entry) for entry in analyzer.entries]
+        self.inflections = [_dumps(inflection) for inflection in analyzer.inflections]
+
+    def entry(self, argument):
+        # isdigit() would also take digits such as ², which int() doesn't
+        if not argument.isdecimal() or int(argument) >= len(self.entries):
+            return None
+        return self.entries[int(argument)]
+
+    def stem(self, argument):
+        found = self.analyzer.stems.get(argument.lower(), ())
+
+        return b"[" + b",".join(
+            b'{"id":' + str(number).encode() + b',"stem_number":' + str(slot).encode() + b',"entry":' + self.entries[number] + b"}"
+            for number, slot in found
+        ) + b"]"
+
+    def analyze(self, argument):
+        return b"[" + b",".join(
+            b'{"id":' + str(found.entry).encode() + b',"inflection_id":' + str(found.inflection).encode()
+            + b',"stem":' + _dumps(found.stem) + b',"ending":' + _dumps(found.ending)
+            + b',"entry":' + self.entries[found.entry] + b',"inflection":' + self.inflections[found.inflection] + b"}"
+            for found in self.analyzer.analyze(argument)
+        ) + b"]"
+
+    def respond(self, path):
+        # Returns the status and body of the response to the path
+        _, kind, argument = (path.split("?", 1)[0].split("/", 2) + ["", ""])[:3]
+        handler = {"entry": self.entry, "stem": self.stem, "analyze": self.analyze}.get(kind)
+
+        body = handler(unquote(argument)) if handler is not None and argument else None
+
+        if body is None:
+            return "404 Not Found", b'{"error":"not found"}'
+
+        return "200 OK", body
+
+
+def _dumps(value):
+    return json.dumps(value, separators = (',', ':')).encode("utf-8")
+
+
+def _response(status, body, keep_alive):
+    return (
+        "HTTP/1.1 " + status + "\r\n"
+        "Content-Type: application/json\r\n"
+        "Content-Length: " + str(len(body)) + "\r\n"
+        "Connection: " + ("keep-alive" if keep_alive else "close") + "\r\n"
+        "\r\n"
+    ).encode("ascii") + body
+
+
+async def handle_connection(lookup, reader, writer):
+    # Serves the requests of one connection, keeping it open between requests unless asked otherwise
+    try:
+        while True:
+            request_line = await reader.readline()
+
+            if not request_line:
+                break
+
+            keep_alive = True
+            while True:
+                header = await reader.readline()
+
+                if header in (b"\r\n", b"\n", b""):
+                    break
+                if header.lower().startswith(b"connection:") and b"close" in header.lower():
+                    keep_alive = False
+
+            parts = request_line.decode("latin-1").split()
+
+            if len(parts) != 3:
+                writer.write(_response("400 Bad Request", b'{"error":"bad request"}', False))
+                break
+
+            method, path, version = parts
+
+            if version == "HTTP/1.0":
+                keep_alive = False
+
+            if method != "GET":
+                writer.write(_response("405 Method Not Allowed", b'{"error":"method not allowed"}', keep_alive))
+            else:
+                status, body = lookup.respond(path)
+                writer.write(_response(status, body, keep_alive))
+
+            await writer.drain()
+
+            if not keep_alive:
+                break
+    except ValueError:
+        # Raised by the reader for lines longer than MAX_LINE
+        writer.write(_response("400 Bad Request", b'{"error":"bad request"}', False))
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(lookup, host = HOST, port = PORT):
+    server = await asyncio.start_server(lambda reader, writer: handle_connection(lookup, reader, writer), host, port, limit = MAX_LINE)
+
+    async with server:
+        await server.serve_forever()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description = "Serves lookups in the converted dictionary over HTTP.")
+    parser.add_argument("--host", default = HOST, help = "address to listen on")
+    parser.add_argument("--port", type = int, default = PORT, help = "port to listen on")
+    parser.add_argument("--dictline", default = jsonisator.DICTLINE_JSON_PATH, help = "converted DICTLINE to serve")
+    parser.add_argument("--inflects", default = jsonisator.INFLECTS_JSON_PATH, help = "converted INFLECTS to serve")
+
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+
+    lookup = Lookup(analysis.Analyzer.load(arguments.dictline, arguments.inflects))
+
+    print("Serving " + str(len(lookup.entries)) + " entries on http://" + arguments.host + ":" + str(arguments.port) + "/")
+
+    try:
+        asyncio.run(serve(lookup, arguments.host, arguments.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+
+from pathlib import Path
+
+import jsonisator
+
+# Sharded variants of the JSON files, so clients which only need part of the dictionary (such as only the verbs,
+# or only the words starting with "con") only download and parse that part.
+#
+# The entries are split into one shard per POS and, for DICTLINE, optionally further by the first one or two
+# letters of their first stem (in lower case). Each shard is a JSON (or NDJSON) file of its own, written in the same
+# form as the whole file, named after its POS and prefix (such as V.json or V-co.json). Entries whose first stem
+# doesn't start with letters are put in the shard of prefix OTHER_PREFIX.
+#
+# The shards of a file are saved to output/shards/DICTLINE/ (or INFLECTS/) along with a manifest of the shards
+# (MANIFEST.json): the name, file, POS, prefix, number of entries, size and SHA-256 of every shard. find_shards()
+# picks the shards a request needs out of it.
+#
+# The shards are written as the entries come: the JSON of each entry is added to the text of its shard, and the
+# texts of all shards are appended to their files whenever they add up to BUFFER_SIZE characters. That way neither
+# the entries nor more than that much of the shards are held in memory, and only one file is open at a time (there
+# are over 2000 shards of DICTLINE with --shard-prefix 2).
+
+SHARDS_DIRECTORY_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "shards"
+MANIFEST_NAME = "MANIFEST.json"
+
+FORMAT_VERSION = 1
+
+OTHER_PREFIX = "_"
+
+BUFFER_SIZE = 1 << 22
+
+
+def stem_prefix(entry, length):
+    stem = entry["stems"][0]
+    prefix = stem[:length].lower()
+
+    if stem == jsonisator.NO_STEM or not prefix.isalpha():
+        return OTHER_PREFIX
+
+    return prefix
+
+
+def shard_name(pos, prefix = None):
+    return pos if prefix is None else pos + "-" + prefix
+
+
+def load_manifest(directory):
+    with open(Path(directory) / MANIFEST_NAME) as manifest_file:
+        return json.load(manifest_file)
+
+
+def output_paths(json_path):
+    # The manifest of the shards of the JSON file, followed by the shards it lists (if it can be read)
+    directory = SHARDS_DIRECTORY_PATH / Path(json_path).stem
+
+    try:
+        manifest = load_manifest(directory)
+    except (OSError, ValueError):
+        return [directory / MANIFEST_NAME]
+
+    return [directory / MANIFEST_NAME] + [directory / shard["file"] for shard in manifest["shards"]]
+
+
+def find_shards(manifest, pos = None, stem = None):
+    # Returns the shards of the manifest which can hold entries of the POS (any if not given) whose first stem starts
+    # with the given letters (any if not given)
+    found = []
+
+    for shard in manifest["shards"]:
+        if pos is not None and shard["pos"] != pos:
+            continue
+
+        if stem and shard["prefix"] is not None:
+            start = stem.lower()[:manifest["prefix_length"]]
+
+            # Stems shorter than the prefixes may also be in the shard of other prefixes (such as "c-")
+            if shard["prefix"] == OTHER_PREFIX:
+                if start.isalpha() and len(start) == manifest["prefix_length"]:
+                    continue
+            elif not start.isalpha() or not shard["prefix"].startswith(start):
+                continue
+
+        found.append(shard)
+
+    return found
+
+
+class _Shard:
+    # A shard being written: the JSON of its entries which wasn't appended to its file yet, along with the size and
+    # SHA-256 of what was
+
+    def __init__(self, pos, prefix, path):
+        self.pos = pos
+        self.prefix = prefix
+        self.path = path
+        self.count = 0
+        self.texts = []
+        self.started = False
+        self.size = 0
+        self.digest = hashlib.sha256()
+
+    def flush(self):
+        data = "".join(self.texts).encode("ascii")
+        self.texts = []
+
+        # Written over the first time, as the shard may be left over from the previous run
+        with open(self.path, "ab" if self.started else "wb") as shard_file:
+            shard_file.write(data)
+
+        self.started = True
+        self.size += len(data)
+        self.digest.update(data)
+
+
+class ShardWriter:
+    # Splits the entries given to add() by shard, writing them to the shards as they come (see BUFFER_SIZE), and
+    # finishes the shards and writes their manifest once closed
+
+    def __init__(self, json_path, prefix_length = 0):
+        json_path = Path(json_path)
+
+        self.directory = SHARDS_DIRECTORY_PATH / json_path.stem
+        self.ndjson = json_path.suffix == ".ndjson"
+        self.extension = ".ndjson" if self.ndjson else ".json"
+        self.source = json_path.name
+        self.prefix_length = prefix_length
+
+        self.encode = jsonisator.json_encoder(ndjson = self.ndjson)
+        self.prefix, self.separator, self.end, _ = jsonisator.json_framing(ndjson = self.ndjson)
+
+        # Shard name -> _Shard
+        self.shards = {}
+        self.buffered = 0
+
+        self.directory.mkdir(parents = True, exist_ok = True)
+
+    def add(self, entry):
+        prefix = stem_prefix(entry, self.prefix_length) if self.prefix_length else None
+        name = shard_name(entry["pos"], prefix)
+
+        shard = self.shards.get(name)
+
+        if shard is None:
+            shard = self.shards[name] = _Shard(entry["pos"], prefix, self.directory / (name + self.extension))
+
+        text = (self.separator if shard.count else self.prefix) + self.encode(entry)
+        shard.texts.append(text)
+        shard.count += 1
+        self.buffered += len(text)
+
+        if self.buffered >= BUFFER_SIZE:
+            self._flush()
+
+    def _flush(self):
+        for shard in self.shards.values():
+            if shard.texts:
+                shard.flush()
+
+        self.buffered = 0
+
+    def _remove_previous(self, files):
+        # Shards of the previous run which weren't written over (such as when the prefix length changed), along
+        # with their compressed variants (see compression.py)
+        try:
+            previous = load_manifest(self.directory)
+        except (OSError, ValueError):
+            return
+
+        for shard in previous["shards"]:
+            if shard["file"] not in files:
+                for path in self.directory.glob(shard["file"] + "*"):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    def close(self):
+        # Every shard has at least one entry, so all of them end the same way
+        for shard in self.shards.values():
+            shard.texts.append(self.end)
+
+        self._flush()
+
+        names = sorted(self.shards)
+        self._remove_previous(set(self.shards[name].path.name for name in names))
+
+        shards = []
+
+        for name in names:
+            shard = self.shards[name]
+            shards.append({
+                "name": name,
+                "file": shard.path.name,
+                "pos": shard.pos,
+                "prefix": shard.prefix,
+                "count": shard.count,
+                "bytes": shard.size,
+                "sha256": shard.digest.hexdigest()
+            })
+
+        with open(self.directory / MANIFEST_NAME, "w") as manifest_file:
+            json.dump({
+                "format": FORMAT_VERSION,
+                "source": self.source,
+                "prefix_length": self.prefix_length,
+                "count": sum(shard["count"] for shard in shards),
+                "shards": shards
+            }, manifest_file, indent = 4)
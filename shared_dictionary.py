@@ -0,0 +1,131 @@
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import binary_format
+import jsonisator
+
+# The dictionary in shared memory, for servers running several worker processes: instead of every worker loading
+# (and holding) a copy of its own, the dictionary is held once, by the operating system, and every worker reads it
+# from there.
+#
+# The dictionary is kept in the binary format of binary_format.py, whose records are of a fixed size and refer to
+# the strings of a heap by their offsets, so any entry can be read in place. SharedDictionary is a view of it which
+# doesn't copy anything out of the buffer: attaching to it only reads the header and the table of strings (a few
+# milliseconds), and entries are decoded straight from the shared pages whenever they are asked for.
+#
+# The buffer is either
+#
+# - a shared memory segment (multiprocessing.shared_memory), made by create() in the process starting the workers
+#   (or by running this module), which the workers attach() to by its name
+# - DICTLINE.bin itself, memory-mapped by open_file() in every worker, which the page cache then shares
+#
+# Only the dictionary is shared. The inflections are few enough for every worker to load its own.
+
+SHARED_NAME = "whitaker-words-dictline"
+
+# Names of the segments made by this process
+_created = set()
+
+
+def _attach_memory(name):
+    # Returns the buffer of the segment and the object to close along with it.
+    #
+    # On POSIX systems, attaching through SharedMemory has the resource tracker of the attaching process take the
+    # segment over, and remove it once the process exits as if it had made it. From Python 3.13, it can be told not
+    # to. Before that, the segment is unregistered from the tracker right after attaching instead, but only by
+    # processes with a tracker of their own: those started by multiprocessing share the tracker of the process which
+    # started them (which made the segment, or will clean up after it), and unregistering from it would drop the
+    # registration of that process. So would the process which made the segment, if it attaches to it itself.
+    if sys.version_info >= (3, 13):
+        memory = shared_memory.SharedMemory(name = name, track = False)
+    else:
+        memory = shared_memory.SharedMemory(name = name)
+
+        if os.name != "nt" and multiprocessing.parent_process() is None and name not in _created:
+            resource_tracker.unregister(memory._name, "shared_memory")
+
+    # Read-only, so the workers can't write to the dictionary they share
+    return memory.buf.toreadonly(), memory
+
+
+def pack(source = binary_format.BINARY_PATH):
+    # The binary dictionary, either read from a .bin file or made from a DICTLINE.json (or .ndjson)
+    source = Path(source)
+
+    if source.suffix == ".bin":
+        return source.read_bytes()
+
+    writer = binary_format.BinaryWriter()
+
+    for entry in jsonisator.iter_json(source):
+        writer.add(entry)
+
+    return writer.tobytes()
+
+
+def create(source = binary_format.BINARY_PATH, name = SHARED_NAME):
+    # Places the dictionary in a new shared memory segment and returns the segment. The process making it owns it:
+    # it has to keep it open for as long as the workers use it, and close() and unlink() it once they are done.
+    data = pack(source)
+    memory = shared_memory.SharedMemory(name = name, create = True, size = len(data))
+    memory.buf[:len(data)] = data
+    _created.add(name)
+
+    return memory
+
+
+class SharedDictionary(binary_format.BinaryDictionary):
+    # Zero-copy view of a binary dictionary held in shared memory or a memory-mapped file
+
+    def __init__(self, buffer, owner = None):
+        super().__init__(buffer, decode_heap = False)
+
+        # The shared memory segment or memory map the buffer belongs to, closed along with the view
+        self.owner = owner
+
+    @classmethod
+    def attach(cls, name = SHARED_NAME):
+        return cls(*_attach_memory(name))
+
+    @classmethod
+    def open_file(cls, path = binary_format.BINARY_PATH):
+        with open(path, "rb") as binary_file:
+            buffer = mmap.mmap(binary_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        return cls(buffer, buffer)
+
+    def close(self):
+        # Every view of the buffer has to be let go of before the buffer itself can be closed
+        self.heap.data.release()
+        self.records.release()
+        self.buffer.release()
+
+        if self.owner is not None:
+            self.owner.close()
+            self.owner = None
+
+
+if __name__ == "__main__":
+    # Places the dictionary in shared memory and keeps it there until interrupted, for workers to attach to:
+    #
+    #   python shared_dictionary.py [DICTLINE.bin or DICTLINE.json] [NAME]
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else (binary_format.BINARY_PATH if binary_format.BINARY_PATH.exists() else jsonisator.DICTLINE_JSON_PATH)
+    name = sys.argv[2] if len(sys.argv) > 2 else SHARED_NAME
+
+    memory = create(source, name)
+    print("Shared " + str(memory.size) + " bytes of " + str(source) + " as " + name + ". Press Ctrl+C to remove it.")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,160 @@
+import sqlite3
+
+import jsonisator
+
+# Exports the dictionary and the inflections to an SQLite database, for ad-hoc querying.
+#
+# Every field of the entries and inflections gets its own typed column (fields a POS doesn't have are NULL),
+# while the stems are kept in a table of their own, one row per stem of an entry. The columns which are searched
+# on (stems, endings, POS with declension/conjugation, frequency) are indexed, and the senses are full-text
+# searchable if SQLite was built with FTS5:
+#
+#   SELECT entries.* FROM stems JOIN entries ON entries.id = stems.entry_id WHERE stems.stem = 'am';
+#   SELECT entries.* FROM senses_fts JOIN entries ON entries.id = senses_fts.rowid WHERE senses_fts MATCH 'table';
+#
+# Ids are the positions of the entries and inflections within DICTLINE.json and INFLECTS.json.
+
+SQLITE_PATH = jsonisator.OUTPUT_DIRECTORY_PATH / "WORDS.sqlite"
+
+# Number of rows inserted by a single executemany
+BATCH_SIZE = 10000
+
+SQL_TYPES = {int: "INTEGER", str: "TEXT"}
+
+
+def _columns(fields):
+    # Every (name, type) of the given schema fields, in the order they first occur
+    columns = {}
+
+    for name, convert in fields:
+        columns.setdefault(name, SQL_TYPES.get(convert, "TEXT"))
+
+    return list(columns.items())
+
+
+ENTRY_COLUMNS = (
+    [("pos", "TEXT")]
+    + _columns(field for _, _, fields in jsonisator.DICTLINE_SCHEMA.values() for field in fields)
+    + [(name, "TEXT") for name in jsonisator.DICTLINE_COMMON_FIELDS]
+    + [("senses", "TEXT")]
+)
+
+INFLECTION_COLUMNS = (
+    [("pos", "TEXT")]
+    + _columns(field for fields in jsonisator.INFLECTS_SCHEMA.values() for field in fields)
+    + _columns(jsonisator.INFLECTS_COMMON_FIELDS)
+)
+
+ENTRY_INDEXES = {
+    "entries_declension": ("pos", "declension", "declension_variant"),
+    "entries_conjugation": ("pos", "conjugation", "conjugation_variant"),
+    "entries_frequency": ("frequency",)
+}
+
+INFLECTION_INDEXES = {
+    "inflections_ending": ("ending",),
+    "inflections_declension": ("pos", "declension", "declension_variant"),
+    "inflections_conjugation": ("pos", "conjugation", "conjugation_variant"),
+    "inflections_frequency": ("frequency",)
+}
+
+
+def _quote(name):
+    # Some of the field names (such as case) are SQL keywords
+    return '"' + name + '"'
+
+
+def _create_table(connection, table, columns):
+    connection.execute("DROP TABLE IF EXISTS " + table)
+    connection.execute("CREATE TABLE " + table + " (id INTEGER PRIMARY KEY, " + ", ".join(_quote(name) + " " + kind for name, kind in columns) + ")")
+
+
+def _create_indexes(connection, table, indexes):
+    # Indexes are created once all the rows are in, which is quicker than keeping them up to date row by row
+    for name, columns in indexes.items():
+        connection.execute("CREATE INDEX " + name + " ON " + table + " (" + ", ".join(_quote(column) for column in columns) + ")")
+
+
+class _TableWriter:
+    # Inserts the entries given to add() as rows of a table, in batches and within a single transaction
+
+    def __init__(self, path, table, columns, indexes):
+        self.connection = sqlite3.connect(path, isolation_level = None)
+        self.table = table
+        self.columns = [name for name, _ in columns]
+        self.indexes = indexes
+        self.rows = []
+        self.count = 0
+
+        self.connection.execute("BEGIN")
+        _create_table(self.connection, table, columns)
+        self.insert = "INSERT INTO " + table + " VALUES (" + ", ".join("?" * (len(self.columns) + 1)) + ")"
+
+    def add(self, entry):
+        self.rows.append((self.count,) + tuple(entry.get(name) for name in self.columns))
+        self.count += 1
+
+        if len(self.rows) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.connection.executemany(self.insert, self.rows)
+        self.rows = []
+
+    def finish(self):
+        # Anything to be done after all the rows are in, but before the transaction is committed
+        pass
+
+    def close(self):
+        self.flush()
+        _create_indexes(self.connection, self.table, self.indexes)
+        self.finish()
+        self.connection.execute("COMMIT")
+        self.connection.close()
+
+
+class DictlineWriter(_TableWriter):
+    # Exports the dictionary entries (the entries and stems tables, along with the senses full-text index)
+
+    def __init__(self, path = SQLITE_PATH):
+        super().__init__(path, "entries", ENTRY_COLUMNS, ENTRY_INDEXES)
+
+        self.connection.execute("DROP TABLE IF EXISTS stems")
+        self.connection.execute("CREATE TABLE stems (entry_id INTEGER NOT NULL REFERENCES entries (id), stem_number INTEGER NOT NULL, stem TEXT NOT NULL)")
+        self.connection.execute("DROP TABLE IF EXISTS senses_fts")
+        self.stem_rows = []
+
+    def add(self, entry):
+        for slot, stem in enumerate(entry["stems"], 1):
+            if stem != jsonisator.NO_STEM:
+                self.stem_rows.append((self.count, slot, stem))
+
+        super().add(entry)
+
+    def flush(self):
+        super().flush()
+        self.connection.executemany("INSERT INTO stems VALUES (?, ?, ?)", self.stem_rows)
+        self.stem_rows = []
+
+    def finish(self):
+        self.connection.execute("CREATE INDEX stems_stem ON stems (stem)")
+        self.connection.execute("CREATE INDEX stems_entry ON stems (entry_id)")
+
+        # The full-text index refers to the senses within the entries table instead of keeping its own copy
+        try:
+            self.connection.execute("CREATE VIRTUAL TABLE senses_fts USING fts5(senses, content = 'entries', content_rowid = 'id')")
+        except sqlite3.OperationalError as error:
+            if "no such module" not in str(error):
+                raise
+
+            print("SQLite was built without FTS5, the senses won't be full-text searchable.")
+            return
+
+        self.connection.execute("INSERT INTO senses_fts (senses_fts) VALUES ('rebuild')")
+
+
+class InflectsWriter(_TableWriter):
+    # Exports the inflections (the inflections table)
+
+    def __init__(self, path = SQLITE_PATH):
+        super().__init__(path, "inflections", INFLECTION_COLUMNS, INFLECTION_INDEXES)
@@ -0,0 +1,82 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import jsonisator
+import shared_dictionary
+import synthetic
+
+# Runs the whole life of a shared dictionary (made by one process, attached to by workers started by
+# multiprocessing, then removed) in a process of its own, as the resource tracker of that process reports any
+# trouble with the segment on its standard error. Can also be run by hand:
+#
+#   python tests/test_shared_dictionary.py
+
+ENTRIES = 200
+WORKERS = 2
+
+
+def _read_all(name, results):
+    dictionary = shared_dictionary.SharedDictionary.attach(name)
+    results.put(sum(1 for _ in dictionary))
+    dictionary.close()
+
+
+def run_cycle(json_path, name):
+    # Returns the number of entries each worker read
+    memory = shared_dictionary.create(json_path, name)
+
+    try:
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        processes = [context.Process(target = _read_all, args = (name, results)) for _ in range(WORKERS)]
+
+        for process in processes:
+            process.start()
+
+        counts = [results.get() for _ in processes]
+
+        for process in processes:
+            process.join()
+    finally:
+        memory.close()
+        memory.unlink()
+
+    return counts
+
+
+class SharedDictionaryTest(unittest.TestCase):
+
+    @unittest.skipIf(os.name == "nt", "the resource tracker is only used on POSIX systems")
+    def test_cycle_leaves_stderr_clean(self):
+        with tempfile.TemporaryDirectory() as directory:
+            dictline_path = Path(directory) / "DICTLINE.TXT"
+            json_path = Path(directory) / "DICTLINE.json"
+
+            synthetic.write_dictline(dictline_path, ENTRIES)
+            jsonisator.write_json(jsonisator.iter_dictline(dictline_path), json_path)
+
+            finished = subprocess.run(
+                [sys.executable, __file__, str(json_path), "whitaker-words-test-" + str(os.getpid())],
+                stdout = subprocess.PIPE, stderr = subprocess.PIPE, universal_newlines = True, timeout = 120
+            )
+
+        self.assertEqual(finished.returncode, 0, finished.stderr)
+        self.assertEqual(finished.stderr, "")
+        self.assertEqual(finished.stdout.split(), [str(ENTRIES)] * WORKERS)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        for count in run_cycle(sys.argv[1], sys.argv[2]):
+            print(count)
+    else:
+        unittest.main()